@@ -0,0 +1,88 @@
+"""Small timeit measurements of py_builtins against the built-ins.
+
+Run with python benchmarks.py [name ...]; each case prints the best of a
+few runs for the pure Python version and for the built-in it stands for."""
+
+import sys
+import timeit
+
+import py_builtins as pb
+
+def _chunks(iterator, size=4096):
+    while pb._next_chunk(iterator, size):
+        pass
+
+def _bench_chunks():
+    yield "map over a range, chunked", lambda: _chunks(pb.map(abs, pb.range(200000))), \
+          lambda: list(map(abs, range(200000)))
+    yield "zip of two ranges, chunked", lambda: _chunks(pb.zip(pb.range(200000), pb.range(200000))), \
+          lambda: list(zip(range(200000), range(200000)))
+    yield "zip of two generators, row by row", \
+          lambda: _chunks(pb.zip((v for v in range(200000)), (v for v in range(200000)))), \
+          lambda: list(zip((v for v in range(200000)), (v for v in range(200000))))
+
+def _bench_length_hints():
+    yield "list(filter) keeping 1 of 10**6 items", lambda: list(pb.filter((5).__eq__, range(10 ** 6))), \
+          lambda: list(filter((5).__eq__, range(10 ** 6)))
+    yield "list(map) over a range", lambda: list(pb.map(abs, range(10 ** 6))), \
+          lambda: list(map(abs, range(10 ** 6)))
+
+def _bench_super():
+    def chain(super):
+        class A:
+            def f(self):
+                return 0
+        classes = [A]
+        for index in range(5):
+            classes.append(type("C%i" % index, (classes[-1],), {}))
+        class D(classes[-1]):
+            def f(self):
+                return super().f()
+        return D
+
+    ours, builtin = chain(pb.super)(), chain(super)()
+    bound_ours, bound_builtin = pb.super(type(ours), ours), super(type(builtin), builtin)
+    yield "100k lookups on super(D, o), 6 levels", lambda: [bound_ours.f for _ in range(100000)], \
+          lambda: [bound_builtin.f for _ in range(100000)]
+    yield "100k calls of super().f()", lambda: [ours.f() for _ in range(100000)], \
+          lambda: [builtin.f() for _ in range(100000)]
+
+def _bench_amap():
+    import asyncio
+
+    async def double(value):
+        return value * 2
+
+    async def ours():
+        async for value in pb.amap(double, range(20000), concurrency=8):
+            pass
+
+    async def plain(): # the same work awaited one item at a time
+        for value in range(20000):
+            await double(value)
+
+    yield "amap over 20k items, concurrency=8", lambda: asyncio.run(ours()), lambda: asyncio.run(plain())
+
+def _bench_distinct():
+    keys = [index % 50000 for index in range(200000)]
+
+    def seen_filter(): # what distinct replaces
+        seen = set()
+        return [key for key in keys if not (key in seen or seen.add(key))]
+
+    yield "distinct over 200k ints, 50k keys", lambda: list(pb.distinct(keys)), seen_filter
+    distinct = pb.distinct(range(100000))
+    list(distinct)
+    print("distinct: %.1f bytes per key for 100k keys" % (distinct.nbytes / 100000))
+
+BENCHMARKS = {"chunks": _bench_chunks, "length_hints": _bench_length_hints, "super": _bench_super,
+              "amap": _bench_amap, "distinct": _bench_distinct}
+
+def main(names):
+    for name in names or BENCHMARKS:
+        for title, ours, builtin in BENCHMARKS[name]():
+            times = [min(timeit.repeat(function, number=1, repeat=5)) for function in (ours, builtin)]
+            print("%-40s py_builtins %8.4f s   built-in %8.4f s" % (title, times[0], times[1]))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
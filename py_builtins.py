@@ -13,15 +13,27 @@ __author__ = "'Vgr' E. Barry"
 
 import sys as _sys
 import os as _os
+import time as _time
+import _thread
+import _weakref
 
-# import the pure Python version of 'open'
+# import the pure Python version of 'open', which open() wraps
 
-from _pyio import OpenWrapper as open
+from _pyio import OpenWrapper as _open
 
 # for eval/exec/compile
 
 import _ast
 
+# these are not imported when Python starts; they are small C modules, though
+# array imports collections.abc to register itself: compact buffers for columns
+# of numbers, binary search in the intervals of rangeset objects, and digests
+# of the keys of distinct objects (the module behind hashlib.blake2b)
+
+import array as _array
+import _bisect
+from _blake2 import blake2b as _blake2b
+
 # help, exit, quit, credits, copyright and license are all defined in the pure Python _sitebuiltins module
 # they will only be defined if Python was not started with the -S flag
 
@@ -65,28 +77,37 @@ def _define_sitebuiltins():
 if not _sys.flags.no_site: _define_sitebuiltins()
 
 _builtin_slice = slice # need to keep it around for proper slice checking
+_builtin_range = range # fills buffers with arithmetic progressions at C speed
+_builtin_zip = zip # builds the rows of chunks at C speed
+_builtin_map = map # applies functions to chunks at C speed, keeping the results before an error
+
+_missing = object() # sentinel for "no value", where None is a valid value
 
 # decorator functions
 
 def _argument(func):
     """Single-argument decorator."""
     def inner(*arg, **keyword):
-        for name in keyword:
-            if name != arg_name:
+        options = {}
+        for name in tuple(keyword):
+            if name in option_names: # keyword-only arguments are passed as-is
+                options[name] = keyword.pop(name)
+            elif name != arg_name:
                 raise TypeError("%s() got an unexpected keyword argument: %r" % (func_name, name))
         if len(arg) > arg_count + 1:
             raise TypeError("%s expected at most %i arguments, got %i" % (func_name, arg_count + 1, len(arg)))
-        if arg and keyword:
+        if len(arg) > arg_count and keyword:
             raise TypeError("%s() got multiple values for argument %r" % (func_name, arg_name))
 
         if keyword:
-            return func(*arg + (keyword[arg_name],))
-        return func(*arg)
+            return func(*arg + (keyword[arg_name],), **options)
+        return func(*arg, **options)
 
     co = func.__code__
     arg_count = co.co_argcount
     func_name = co.co_name
-    arg_name = co.co_varnames[arg_count]
+    option_names = co.co_varnames[arg_count:arg_count + co.co_kwonlyargcount]
+    arg_name = co.co_varnames[arg_count + co.co_kwonlyargcount]
 
     inner.__name__ = func.__name__
     inner.__doc__ = func.__doc__
@@ -154,14 +175,22 @@ def _max_min_caller(func):
 
 # private behind-the-scenes functions
 
-def _iter(callable, sentinel):
-    """Two-arguments form of iter()."""
+def _iter_readinto(readinto, buffersize, buffers):
+    """Two-arguments form of iter() reading into a pool of reused buffers."""
+    pool = []
+    while len(pool) < buffers:
+        pool.append(memoryview(bytearray(buffersize)))
+
+    index = 0
     while True:
-        result = callable()
-        if result != sentinel:
-            yield result
-        else:
+        view = pool[index]
+        count = readinto(view)
+        if not count:
             return
+        yield view if count == buffersize else view[:count]
+        index += 1
+        if index == buffers:
+            index = 0
 
 def _change_base(number, base, fill=1):
     """Function behind bin(), hex() and oct()."""
@@ -189,6 +218,797 @@ def _change_base(number, base, fill=1):
 
     return "".join(total)
 
+def _take_args(iterator):
+    """Take the reusable argument list of a map or zip object.
+
+    The list is handed back by storing it in iterator._args once it has been
+    filled, so a re-entrant call (an input pulling from the same object)
+    gets a fresh list instead of clobbering the one in use."""
+    args = iterator._args
+    if args is None:
+        return [None] * len(iterator._nexts)
+    iterator._args = None
+    return args
+
+def _next_chunk(iterator, size):
+    """Return a list of up to 'size' items from iterator, empty once exhausted.
+
+    Iterators can provide this themselves with a __next_chunk__(size) method,
+    which is what lets a chain of map, filter, zip and enumerate objects hand
+    whole batches down to the consumer."""
+    try:
+        next_chunk = type(iterator).__next_chunk__
+    except AttributeError:
+        pass
+    else:
+        return next_chunk(iterator, size)
+
+    chunk = []
+    next_item = iterator.__next__
+    try:
+        while size > 0:
+            chunk.append(next_item())
+            size -= 1
+    except StopIteration:
+        pass
+    return chunk
+
+def _next_chunk_columns(iterators, size):
+    """Return a list of equally long lists of up to 'size' items, one per iterator.
+
+    Like zip, at most one item more than is used is taken from the iterators
+    before the shortest one: the chunk is capped at the smallest number of
+    items left, and taken one row at a time when one of them is not known
+    exactly (length hints are only estimates)."""
+    if len(iterators) > 1:
+        for iterator in iterators:
+            length = _exact_length(iterator)
+            if length is None:
+                return _next_rows_columns(iterators, size)
+            if length < size:
+                size = length
+        if not size: # as zip, take one item from the inputs before the empty one
+            return _next_rows_columns(iterators, 1)
+
+    columns = []
+    for iterator in iterators:
+        column = _next_chunk(iterator, size)
+        if len(column) < size:
+            # only happens when a sequence shrank while iterated
+            size = len(column)
+            if not size:
+                return []
+        columns.append(column)
+
+    if len(columns[0]) > size:
+        columns = [column[:size] for column in columns]
+    return columns
+
+def _next_rows_columns(iterators, size):
+    """Return the columns of up to 'size' rows taken across iterators, as zip does."""
+    nexts = [iterator.__next__ for iterator in iterators]
+    rows = []
+    try:
+        while len(rows) < size:
+            rows.append([next_item() for next_item in nexts])
+    except StopIteration:
+        pass
+    if not rows:
+        return []
+    return [list(column) for column in _builtin_zip(*rows)]
+
+def _next_chunk_rows(iterators, size):
+    """Return a list of up to 'size' tuples taken across iterators, like zip."""
+    if not iterators:
+        return []
+    columns = _next_chunk_columns(iterators, size)
+    if not columns:
+        return []
+    return list(_builtin_zip(*columns))
+
+class _pushback:
+    """Stand-in for the __next__ method of an input of a map or filter object.
+
+    It gives back the items a __next_chunk__ call read ahead of an exception
+    raised by the function, after raising that exception if the results
+    before it were returned first."""
+
+    __slots__ = ("items", "error", "next")
+
+    def __init__(self, items, error, next_item):
+        self.items = items[::-1] # popped from the end
+        self.error = error
+        self.next = next_item
+
+    def __call__(self):
+        error = self.error
+        if error is not None:
+            self.error = None
+            raise error
+        if self.items:
+            return self.items.pop()
+        return self.next()
+
+def _holding(pushbacks):
+    """Return whether any of the _pushback objects still has an item or an error."""
+    for pushback in pushbacks:
+        if type(pushback) is _pushback and (pushback.items or pushback.error is not None):
+            return True
+    return False
+
+def _next_chunk_held(iterator, size, pushbacks):
+    """Return a list of up to 'size' items from a map or filter object whose
+    inputs were replaced by _pushback objects, one item at a time.
+
+    Return None once nothing is held anymore, so that the caller can put its
+    inputs back and go on a whole chunk at a time."""
+    if not _holding(pushbacks):
+        return None
+
+    chunk = []
+    next_item = iterator.__next__
+    try:
+        while len(chunk) < size:
+            chunk.append(next_item())
+    except Exception as exc:
+        if chunk: # return what is done, and raise on the next call
+            pushbacks[0].error = exc
+        elif not isinstance(exc, StopIteration):
+            raise
+    return chunk
+
+def _map_chunk(function, rows, index):
+    """Call function on every argument tuple of rows, for a map with workers.
+
+    Return the list of results and the exception that stopped the chunk, or
+    None; the exception gets a note with the index of the failing item."""
+    results = []
+    try:
+        for args in rows:
+            results.append(function(*args))
+            index += 1
+    except Exception as exc:
+        if _sys.version_info >= (3, 11):
+            exc.add_note("raised by map() for item %i" % index)
+        return results, exc
+    return results, None
+
+def _fuse_shape(node, params):
+    """Describe the chain rooted at node for fuse().
+
+    The arguments of the fused generator are appended to params in the
+    order _fuse_emit() consumes them; the returned shape is the cache key."""
+    kind = type(node)
+    if kind is map:
+        params.append(node.function)
+        return ("map",) + tuple([_fuse_shape(iterator, params) for iterator in node.iterators])
+    if kind is filter:
+        if node.callable is not None:
+            params.append(node.callable)
+        return ("filter", node.callable is not None, _fuse_shape(node.iterator, params))
+    if kind is enumerate:
+        params.append(node.index)
+        return ("enumerate", _fuse_shape(node.iterator, params))
+    if kind is zip and not (node._strict or node._longest):
+        return ("zip",) + tuple([_fuse_shape(iterator, params) for iterator in node.iterators])
+    params.append(node.__next__)
+    return ("source",)
+
+def _fuse_emit(shape, lines, setup, names, indent):
+    """Emit the code producing one value of a node; return its variable."""
+    pad = "    " * indent
+    kind = shape[0]
+    arg = "a%i" % len(names)
+    if kind not in ("filter", "zip") or kind == "filter" and shape[1]:
+        names.append(arg)
+
+    if kind == "source":
+        value = "v%i" % len(lines)
+        lines.append("%stry:" % pad)
+        lines.append("%s    %s = %s()" % (pad, value, arg))
+        lines.append("%sexcept StopIteration:" % pad)
+        lines.append("%s    return" % pad)
+
+    elif kind == "map":
+        args = [_fuse_emit(child, lines, setup, names, indent) for child in shape[1:]]
+        value = "v%i" % len(lines)
+        lines.append("%s%s = %s(%s)" % (pad, value, arg, ", ".join(args)))
+
+    elif kind == "filter":
+        lines.append("%swhile True:" % pad)
+        value = _fuse_emit(shape[2], lines, setup, names, indent + 1)
+        lines.append("%s    if %s:" % (pad, "%s(%s)" % (arg, value) if shape[1] else value))
+        lines.append("%s        break" % pad)
+
+    elif kind == "enumerate":
+        counter = "i%i" % len(setup)
+        setup.append("    %s = %s" % (counter, arg))
+        item = _fuse_emit(shape[1], lines, setup, names, indent)
+        value = "v%i" % len(lines)
+        lines.append("%s%s = (%s, %s)" % (pad, value, counter, item))
+        lines.append("%s%s += 1" % (pad, counter))
+
+    elif kind == "zip":
+        items = [_fuse_emit(child, lines, setup, names, indent) for child in shape[1:]]
+        value = "v%i" % len(lines)
+        lines.append("%s%s = (%s,)" % (pad, value, ", ".join(items)))
+
+    return value
+
+def _fuse_compile(shape):
+    """Build the generator function for a chain of the given shape."""
+    lines, setup, names = [], [], []
+    value = _fuse_emit(shape, lines, setup, names, 3)
+    # a StopIteration from a function ends the loop, as it ends a loop over
+    # the chain, instead of becoming a RuntimeError in the generator
+    source = "\n".join(["def fused(%s):" % ", ".join(names)] + setup +
+                       ["    while True:", "        try:"] + lines +
+                       ["        except StopIteration:", "            return",
+                        "        yield " + value])
+    namespace = {}
+    exec(source, namespace)
+    return namespace["fused"]
+
+_fused_cache = {}
+
+def _aiter(iterable):
+    """Get an asynchronous iterator from an asynchronous or plain iterable."""
+    if hasattr(type(iterable), "__aiter__"):
+        return type(iterable).__aiter__(iterable)
+    return _aiter_sync(iter(iterable))
+
+async def _aiter_sync(iterator):
+    """Asynchronous iterator over a plain iterator."""
+    for item in iterator:
+        yield item
+
+async def _await_result(value):
+    """Return value, awaiting it first if it is awaitable."""
+    if hasattr(type(value), "__await__"):
+        return await value
+    return value
+
+async def _anext_row(iterators):
+    """Return a tuple with the next item of every asynchronous iterator."""
+    return tuple([await type(iterator).__anext__(iterator) for iterator in iterators])
+
+async def _aclose(*iterators):
+    """Close the asynchronous iterators which support it."""
+    for iterator in iterators:
+        aclose = getattr(type(iterator), "aclose", None)
+        if aclose is not None:
+            await aclose(iterator)
+
+def _zip_check_strict(iterators, index):
+    """Raise ValueError for a strict zip whose iterator at index ran out."""
+    if index:
+        raise ValueError("zip() argument %i is shorter than argument%s%i" %
+                         (index + 1, " " if index == 1 else "s 1-", index))
+
+    index = 1
+    while index < len(iterators):
+        try:
+            next(iterators[index])
+        except StopIteration:
+            index += 1
+        else:
+            raise ValueError("zip() argument %i is longer than argument%s%i" %
+                             (index + 1, " " if index == 1 else "s 1-", index))
+
+def _zip_stop():
+    """Stand-in for the iterators of a longest zip object once it is exhausted."""
+    raise StopIteration
+
+# iterators whose __length_hint__ is the exact number of items left
+
+_exact_iterators = frozenset([type(iter(sequence)) for sequence in
+                              ([], (), "", b"", bytearray(), _builtin_range(0), _builtin_range(1 << 64))])
+
+def _exact_length(iterator):
+    """Return the number of items left in iterator if it is known exactly, else None.
+
+    Only the iterators of built-in sequences and of range objects are
+    trusted, and map, zip and enumerate objects over them; a filter object
+    or anything else may give fewer items than its hint."""
+    kind = type(iterator)
+    if kind in _exact_iterators or kind is range_iterator:
+        return _length_hint(iterator)
+    if kind is enumerate:
+        return _exact_length(iterator.iterator)
+    if kind is map or kind is zip and not iterator._longest:
+        result = None
+        for inner in iterator.iterators:
+            length = _exact_length(inner)
+            if length is None:
+                return None
+            if result is None or length < result:
+                result = length
+        return result
+    return None
+
+def _length_hint(iterable):
+    """Return len(iterable) or its __length_hint__(), or None if neither is known."""
+    try:
+        return type(iterable).__len__(iterable)
+    except AttributeError:
+        pass
+    except TypeError: # e.g. len() of a shared range object which is too large
+        return None
+
+    try:
+        hint = type(iterable).__length_hint__
+    except AttributeError:
+        return None
+
+    hint = hint(iterable)
+    if hint is NotImplemented:
+        return None
+    return hint
+
+def _buffer_view(object):
+    """Return a flat memoryview of object, or None if it has no buffer."""
+    try:
+        view = memoryview(object)
+    except TypeError:
+        return None
+    if view.ndim != 1:
+        view.release()
+        return None
+    return view
+
+def _checkpoint(iterator):
+    """Return the position of iterator as a picklable (type name, state) pair.
+
+    Iterators can provide their state with a __checkpoint__() method, which
+    is what lets a pipeline be saved stage by stage, down to its sources.
+    """
+    kind = type(iterator)
+    if hasattr(kind, "__checkpoint__"):
+        return kind.__name__, kind.__checkpoint__(iterator)
+
+    if hasattr(kind, "tell") and hasattr(kind, "seek"): # file iterated by line
+        try:
+            return "file", iterator.tell()
+        except OSError as exc: # text files cannot tell() while next() is used
+            raise TypeError("cannot checkpoint a text file iterated by line; "
+                            "use iter(file.readline, '') instead") from exc
+
+    if kind.__module__ == "builtins" and hasattr(kind, "__setstate__"):
+        # list, tuple, str, bytes and range iterators give their index
+        reduced = iterator.__reduce__()
+        return kind.__name__, reduced[2] if len(reduced) > 2 else None
+
+    raise TypeError("cannot checkpoint %r objects" % kind.__name__)
+
+def _resume(iterator, state):
+    """Move iterator to the position given by _checkpoint()."""
+    name, state = state
+    kind = type(iterator)
+    if name == "file":
+        if not hasattr(kind, "seek"):
+            raise ValueError("cannot resume a %r object from the checkpoint of a file" % kind.__name__)
+        iterator.seek(state)
+        return
+
+    if kind.__name__ != name:
+        raise ValueError("cannot resume a %r object from the checkpoint of a %r object"
+                         % (kind.__name__, name))
+
+    if hasattr(kind, "__resume__"):
+        kind.__resume__(iterator, state)
+    elif state is not None:
+        iterator.__setstate__(state)
+    else: # exhausted
+        reduced = iterator.__reduce__()
+        if len(reduced) > 2:
+            reverse = getattr(reduced[0], "__name__", None) == "reversed"
+            iterator.__setstate__(-1 if reverse else len(reduced[1][0]))
+
+def _item_size(item):
+    """Return the size of item in bytes, as counted by prefetch()."""
+    try:
+        view = memoryview(item)
+    except TypeError:
+        return _sys.getsizeof(item)
+    size = view.nbytes
+    view.release()
+    return size
+
+def _instrument(iterator):
+    """Return a _probe over iterator, after instrumenting its own inputs.
+
+    Iterators can have their inputs and function wrapped with an
+    __instrument__() method; the others are only counted and timed as a
+    whole.  Nothing is added to the iterators which are not instrumented.
+    """
+    kind = type(iterator)
+    inputs, timer = (), None
+    if hasattr(kind, "__instrument__"):
+        inputs, timer = kind.__instrument__(iterator)
+    return _probe(iterator, inputs, timer)
+
+def _digest(key):
+    """Return a 128-bit digest of key, equal for equal keys across processes.
+
+    Only None, numbers, strings, bytes, and tuples and frozensets of them are
+    digested, as these are the types whose equality the digest can follow;
+    anything else raises TypeError."""
+    kind = type(key)
+    if kind is complex and not key.imag: # complex(1, 0) == 1
+        key = key.real
+        kind = float
+    if kind is float and key.is_integer(): # 1.0 == 1
+        key = int(key)
+        kind = int
+
+    if kind is str:
+        data, kind = key.encode("utf-8", "surrogatepass"), b"s"
+    elif kind is bytes:
+        data, kind = key, b"b"
+    elif kind is int or kind is bool:
+        data, kind = key.to_bytes((key.bit_length() + 8) // 8, "little", signed=True), b"i"
+    elif kind is float:
+        data, kind = key.hex().encode(), b"f"
+    elif kind is complex:
+        data, kind = ("%s %s" % (key.real.hex(), key.imag.hex())).encode(), b"c"
+    elif key is None:
+        data, kind = b"", b"n"
+    elif kind is tuple:
+        data, kind = b"".join([_digest(item).to_bytes(16, "little") for item in key]), b"t"
+    elif kind is frozenset: # equal sets may be iterated in different orders
+        data, kind = b"".join(sorted([_digest(item).to_bytes(16, "little") for item in key])), b"z"
+    else:
+        raise TypeError("cannot compare %r keys by digest; use a key function giving "
+                        "numbers, strings, bytes or tuples of them" % kind.__name__)
+    return int.from_bytes(_blake2b(data, digest_size=16, person=kind).digest(), "little")
+
+def _aggregate_new(codes, value):
+    """Return the accumulators of a group whose first value is value."""
+    return [1 if code == 3 else value for code in codes]
+
+def _aggregate_add(accumulators, codes, value):
+    """Add value to the accumulators of a group, for aggregate()."""
+    index = 0
+    for code in codes:
+        if code == 0: # sum
+            accumulators[index] = accumulators[index] + value
+        elif code == 1: # min
+            if value < accumulators[index]:
+                accumulators[index] = value
+        elif code == 2: # max
+            if accumulators[index] < value:
+                accumulators[index] = value
+        else: # count
+            accumulators[index] += 1
+        index += 1
+
+def _aggregate_combine(accumulators, codes, other):
+    """Merge the accumulators of a later part of a group into accumulators."""
+    index = 0
+    for code in codes:
+        value = other[index]
+        if code == 0 or code == 3: # sum and count
+            accumulators[index] = accumulators[index] + value
+        elif code == 1:
+            if value < accumulators[index]:
+                accumulators[index] = value
+        elif accumulators[index] < value:
+            accumulators[index] = value
+        index += 1
+
+def _aggregate_hash(iterator, key, value, codes, max_groups, dir):
+    """Yield the (key, accumulators) pairs of the groups of iterator, by hashing."""
+    groups = {}
+    partitions = None
+    for item in iterator:
+        group = key(item)
+        accumulators = groups.get(group)
+        if accumulators is not None:
+            _aggregate_add(accumulators, codes, item if value is None else value(item))
+            continue
+        groups[group] = _aggregate_new(codes, item if value is None else value(item))
+        if max_groups is not None and len(groups) > max_groups:
+            partitions = _aggregate_spill(groups, partitions, 0, dir)
+
+    if partitions is None:
+        yield from groups.items()
+        return
+    _aggregate_spill(groups, partitions, 0, dir)
+    yield from _aggregate_partitions(partitions, codes, max_groups, dir, 1)
+
+def _aggregate_spill(groups, partitions, depth, dir):
+    """Append groups to temporary partition files, by hash of key, and clear it."""
+    import pickle
+    import tempfile
+
+    if partitions is None:
+        partitions = []
+        while len(partitions) < 16:
+            partitions.append(tempfile.TemporaryFile(dir=dir))
+    buckets = [[] for file in partitions]
+    for group, accumulators in groups.items():
+        # another depth sorts the groups of a partition into other partitions
+        buckets[hash((depth, group)) % 16].append((group, accumulators))
+    for file, bucket in zip(partitions, buckets):
+        if bucket:
+            pickle.dump(bucket, file, pickle.HIGHEST_PROTOCOL)
+    groups.clear()
+    return partitions
+
+def _aggregate_partitions(partitions, codes, max_groups, dir, depth):
+    """Merge the parts of the groups in each partition file, and yield them."""
+    import pickle
+
+    for file in partitions:
+        with file:
+            file.seek(0)
+            groups = {}
+            spilled = None
+            while True:
+                try:
+                    bucket = pickle.load(file)
+                except EOFError:
+                    break
+                for group, other in bucket: # earlier parts come first
+                    accumulators = groups.get(group)
+                    if accumulators is not None:
+                        _aggregate_combine(accumulators, codes, other)
+                        continue
+                    groups[group] = other
+                    if max_groups is not None and len(groups) > max_groups:
+                        spilled = _aggregate_spill(groups, spilled, depth, dir)
+
+            if spilled is None:
+                yield from groups.items()
+                continue
+            _aggregate_spill(groups, spilled, depth, dir)
+            if len([part for part in spilled if part.tell()]) < 2:
+                # every group went to the same partition again, as keys with
+                # equal hashes do at any depth: merge them in memory instead
+                yield from _aggregate_partitions(spilled, codes, None, dir, depth + 1)
+            else:
+                yield from _aggregate_partitions(spilled, codes, max_groups, dir, depth + 1)
+
+def _aggregate_sorted(iterator, key, value, codes):
+    """Yield the (key, accumulators) pairs of the groups of iterator, which are contiguous."""
+    current = accumulators = _missing
+    for item in iterator:
+        group = key(item)
+        if accumulators is not _missing and group == current:
+            _aggregate_add(accumulators, codes, item if value is None else value(item))
+            continue
+        if accumulators is not _missing:
+            yield current, accumulators
+        current, accumulators = group, _aggregate_new(codes, item if value is None else value(item))
+
+    if accumulators is not _missing:
+        yield current, accumulators
+
+def _aggregate_results(pairs, codes, start, single):
+    """Turn (key, accumulators) pairs into the (key, result) pairs of aggregate()."""
+    for group, accumulators in pairs:
+        index = 0
+        for code in codes:
+            if code == 0:
+                accumulators[index] = start + accumulators[index]
+            index += 1
+        yield group, accumulators[0] if single else tuple(accumulators)
+
+def _range_length(start, stop, step):
+    """Return the number of values of range(start, stop, step)."""
+    if step > 0:
+        length = (stop - start + step - 1) // step
+    else:
+        length = (start - stop - step - 1) // -step
+    return length if length > 0 else 0
+
+def _progression(start, stop, step):
+    """Return the values of range(start, stop, step), for step > 0, as a
+    (first, last + 1, step) triple with a step of 1 for a single value, or
+    None if there are none."""
+    if start >= stop:
+        return None
+    last = start + (stop - 1 - start) // step * step
+    if last == start:
+        return start, start + 1, 1
+    return start, last + 1, step
+
+def _progression_from(start, value, step):
+    """Return the first value of the progression from start by step which is >= value."""
+    return start + (value - start + step - 1) // step * step
+
+def _progression_common(first, second):
+    """Return the values in both of two progressions as a (progression, step) pair.
+
+    The step is the one of all the common values, even where there are fewer
+    than two of them in the progression; the progression is None if there
+    are none."""
+    from math import gcd
+
+    start1, stop1, step1 = first
+    start2, stop2, step2 = second
+    divisor = gcd(step1, step2)
+    step = step1 // divisor * step2
+    low = start1 if start1 > start2 else start2
+    high = stop1 if stop1 < stop2 else stop2
+    if low >= high or (start2 - start1) % divisor:
+        return None, step
+
+    # first common value, solving start1 + step1 * k == start2 modulo step2
+    modulus = step2 // divisor
+    k = (start2 - start1) // divisor * pow(step1 // divisor, -1, modulus) % modulus if modulus > 1 else 0
+    return _progression(_progression_from(start1 + step1 * k, low, step), high, step), step
+
+def _progression_difference(first, second):
+    """Return the values of the first progression not in the second, as a list of progressions."""
+    common, common_step = _progression_common(first, second)
+    if common is None:
+        return [first]
+
+    start, stop, step = first
+    low = start if start > second[0] else second[0]
+    high = stop if stop < second[1] else second[1]
+    pieces = [_progression(start, low, step),
+              _progression(_progression_from(start, high, step), stop, step)]
+
+    # the values of first between low and high, without every ratio-th one
+    ratio = common_step // step
+    if ratio - 1 > _rangeset_limit:
+        raise ValueError("rangeset difference would give %i interleaved progressions" % (ratio - 1))
+    middle = _progression_from(start, low, step)
+    for offset in _builtin_range(1, ratio):
+        value = common[0] + offset * step
+        pieces.append(_progression(value - (value - middle) // common_step * common_step, high, common_step))
+    return [piece for piece in pieces if piece is not None]
+
+def _progressions_merge(pieces):
+    """Return the (starts, stops, steps) arrays of the rangeset holding the
+    values of pieces, a list of progressions as given by _progression().
+
+    The pieces are taken by their first value, and the ones which overlap
+    are cut so that the spans of the result are disjoint; overlapping parts
+    of progressions with different steps are expanded into their values."""
+    import heapq
+
+    heapq.heapify(pieces)
+    starts, stops, steps = _array.array("q"), _array.array("q"), _array.array("q")
+    while pieces:
+        start, stop, step = heapq.heappop(pieces)
+        if not starts or start >= stops[-1]: # after the last piece
+            if starts:
+                last_start, last, last_step = starts[-1], stops[-1] - 1, steps[-1]
+                if last == last_start: # a single value goes on with any step
+                    if stop == start + 1 or start - last_start == step:
+                        stops[-1] = stop
+                        steps[-1] = start - last_start if stop == start + 1 else step
+                        continue
+                elif start == last + last_step and (stop == start + 1 or step == last_step):
+                    stops[-1] = stop
+                    continue
+            starts.append(start)
+            stops.append(stop)
+            steps.append(step)
+            continue
+
+        last_start, last_stop, last_step = starts.pop(), stops.pop(), steps.pop()
+        if last_step == 1: # the last piece holds every value up to its end
+            starts.append(last_start)
+            stops.append(last_stop)
+            steps.append(last_step)
+            rest = _progression(_progression_from(start, last_stop, step), stop, step)
+            if rest is not None:
+                heapq.heappush(pieces, rest)
+            continue
+
+        head = _progression(last_start, start, last_step)
+        if head is not None:
+            starts.append(head[0])
+            stops.append(head[1])
+            steps.append(head[2])
+        if step == 1: # the new piece holds every value over its span
+            heapq.heappush(pieces, (start, stop, step))
+            rest = _progression(_progression_from(last_start, stop, last_step), last_stop, last_step)
+            if rest is not None:
+                heapq.heappush(pieces, rest)
+        elif step == last_step and not (start - last_start) % step:
+            heapq.heappush(pieces, (start, stop if stop > last_stop else last_stop, step))
+        else: # interleaved progressions: expand the part where both are
+            high = stop if stop < last_stop else last_stop
+            first = _progression_from(last_start, start, last_step)
+            if (high - first) // last_step + (high - start) // step > _rangeset_limit:
+                raise ValueError("rangeset cannot hold interleaved progressions over "
+                                 "more than %i values" % _rangeset_limit)
+            values = set(_builtin_range(first, high, last_step))
+            values.update(_builtin_range(start, high, step))
+            for value in values:
+                heapq.heappush(pieces, (value, value + 1, 1))
+            for rest in (_progression(_progression_from(last_start, high, last_step), last_stop, last_step),
+                         _progression(_progression_from(start, high, step), stop, step)):
+                if rest is not None:
+                    heapq.heappush(pieces, rest)
+    return starts, stops, steps
+
+def _as_builtin_range(object):
+    """Return object as a built-in range if it is a range of integers, else None."""
+    if isinstance(object, _builtin_range):
+        return object
+    if isinstance(object, range):
+        try:
+            return _builtin_range(object.start, object.stop, object.step)
+        except TypeError:
+            return None
+    return None
+
+def _slice_index(value):
+    """Return value as an integer, for the indices of a slice."""
+    if hasattr(type(value), "__index__"):
+        return type(value).__index__(value)
+    raise TypeError("slice indices must be integers or None or have an __index__ method")
+
+def _reversed_lines(file):
+    """Return an iterator over the lines of file from the last one down to its
+    current position, reading it backwards through mmap; file must be a
+    regular file."""
+    import io
+    import stat
+
+    encoding = getattr(file, "encoding", None) # None for binary files
+    if encoding is not None and "\n".encode(encoding) != b"\n":
+        raise ValueError("cannot read %s text backwards by line" % encoding)
+    if not file.readable():
+        raise io.UnsupportedOperation("not readable")
+
+    status = _os.fstat(file.fileno())
+    if not stat.S_ISREG(status.st_mode):
+        # pipes, terminals and devices have no size and cannot be mapped
+        raise TypeError("reversed() needs a regular file; use reversed(file.readlines()) "
+                        "for pipes and devices")
+    # the newline argument of open(); files of the io module do not expose
+    # it and are taken to use the default, universal newlines
+    newline = getattr(file, "_readnl", None) if encoding is not None else "\n"
+    position = file.tell()
+    if position > status.st_size: # text positions holding decoder state
+        raise ValueError("cannot read backwards from position %r" % position)
+    return _reversed_mapped_lines(file, encoding, newline, position, status.st_size)
+
+def _reversed_mapped_lines(file, encoding, newline, first, size):
+    """Yield the lines between the offsets first and size of file, from the
+    last one; newline is as for open(), with "\n" for binary files."""
+    import mmap
+
+    if first >= size: # empty files cannot be mapped
+        return
+    separator = newline.encode("ascii") if newline else b"\n"
+    width = 2 if separator == b"\r\n" else 1
+    with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as data:
+        # without any "\r", universal newlines are lines ending with "\n"
+        universal = not newline and data.find(b"\r", first) >= 0
+        end = released = size
+        while end > first:
+            # the line ends at end, after the newline ending the line before
+            if not universal:
+                body = end - width if data[end - width:end] == separator else end
+            elif data[end - 1] == 10: # "\n"
+                body = end - 2 if end - 2 >= first and data[end - 2] == 13 else end - 1
+            else:
+                body = end - 1 if data[end - 1] == 13 else end # "\r" or no newline
+            start = data.rfind(separator, first, body)
+            start = first if start < 0 else start + width
+            if universal: # a lone "\r" after the last "\n" also ends a line
+                start = data.rfind(b"\r", start, body) + 1 or start
+            line = data[start:end]
+            if encoding is not None:
+                if universal and newline is None and body < end:
+                    line = line[:body - start] + b"\n" # translate "\r\n" and "\r"
+                line = line.decode(encoding, file.errors)
+            end = start
+            if released - end >= 1 << 26 and hasattr(mmap, "MADV_DONTNEED"):
+                # unmap the pages read so far every 64 MiB, so memory stays bounded
+                offset = -(-end // mmap.PAGESIZE) * mmap.PAGESIZE
+                data.madvise(mmap.MADV_DONTNEED, offset, released - offset)
+                released = offset
+            yield line
+
 def _filler(string, fill, filler="0"):
     """Fill the string with 'filler' so that len(string) % fill == 0."""
     if not len(string) % fill:
@@ -211,6 +1031,50 @@ def abs(num):
 
     raise TypeError("bad operand type for abs(): %r" % type(num).__name__)
 
+def aggregate(iterable, key, ops="sum", value=None, *, start=0, sorted=False, max_groups=None, dir=None):
+    """aggregate(iterable, key, ops="sum", value=None, *, start=0, sorted=False, max_groups=None, dir=None) -> iterator
+
+    Group the items of iterable by key(item), and reduce the values of each
+    group (value(item), or the item itself if value is None) in one pass,
+    giving an iterator of (key, result) pairs.  ops is "sum", "min", "max"
+    or "count", or a tuple of them to get a tuple of results per group;
+    they work as sum(values, start), min(values), max(values) and the
+    number of values, start being added to the total of each group.
+    Each group keeps one accumulator per op in a dict, and the groups come
+    out in order of first appearance.  With max_groups, whenever there are
+    more groups than that, they are spilled to temporary files (in dir) in
+    16 partitions by key, which are merged at the end; the groups then come
+    out partition by partition.  A partition whose groups all go to the same
+    partition again when split, as keys with equal hashes do, is merged in
+    memory whatever its size.
+    With sorted=True, the items of each group must be next to each other in
+    iterable, as when it is sorted by key; only one group is kept at a time.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    names = (ops,) if isinstance(ops, str) else tuple(ops)
+    if not names:
+        raise ValueError("aggregate() needs at least one op")
+    codes = []
+    for name in names:
+        if name not in ("sum", "min", "max", "count"):
+            raise ValueError("unknown op %r, expected 'sum', 'min', 'max' or 'count'" % (name,))
+        codes.append(("sum", "min", "max", "count").index(name))
+    codes = tuple(codes)
+
+    if isinstance(start, str):
+        raise TypeError("sum() can't sum strings [use ''.join(seq) instead]")
+    if max_groups is not None and max_groups < 1:
+        raise ValueError("max_groups must be at least one")
+
+    if sorted:
+        pairs = _aggregate_sorted(iter(iterable), key, value, codes)
+    else:
+        pairs = _aggregate_hash(iter(iterable), key, value, codes, max_groups, dir)
+    return _aggregate_results(pairs, codes, start, isinstance(ops, str))
+
 def all(*iterable):
     """all(iterable[, items]) -> bool
 
@@ -303,6 +1167,22 @@ def callable(object):
 
     return hasattr(object, "__call__")
 
+def checkpoint(iterator):
+    """checkpoint(iterator) -> state
+
+    Return the position of an iterator pipeline, as a small picklable object.
+    The pipeline may be made of enumerate, filter, map, zip, reversed,
+    batched, windowed and two-argument iter() objects, over sequences, range
+    objects and files.  The sources themselves are not saved: sequences and
+    ranges are recorded by index, and files by their tell() offset.
+    resume() moves a pipeline built the same way to the saved position.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    return _checkpoint(iterator)
+
 def chr(num): # WRAPPER
     """chr(i) -> Unicode character
 
@@ -431,6 +1311,31 @@ def format(value, format_spec=""):
 
     return type(value).__format__(value, format_spec)
 
+def fuse(iterator):
+    """fuse(iterator) -> generator
+
+    Compile a chain of map, filter, enumerate and zip objects, such as
+    map(f, filter(p, enumerate(xs))), into a single generator that does
+    the work of every stage in one loop.  Items are still pulled one at a
+    time and in the same order, and a StopIteration raised by a function or
+    predicate ends the generator.  The generated code is cached by the shape
+    of the chain.  The generator takes over the iterators of the chain, so
+    the chain itself must not be used anymore.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    params = []
+    shape = _fuse_shape(iterator, params)
+    if shape == ("source",):
+        return iter(iterator)
+
+    function = _fused_cache.get(shape)
+    if function is None:
+        function = _fused_cache[shape] = _fuse_compile(shape)
+    return function(*params)
+
 @_argument
 def getattr(object, attribute, *fallback):
     """getattr(object, name[, default]) -> value
@@ -531,6 +1436,26 @@ def input(prompt=""):
 
     return result.rstrip("\r\n")
     
+def instrument(iterator):
+    """instrument(iterator) -> iterator
+
+    Return an iterator over the items of an iterator pipeline, which counts
+    and times what each of its stages does.  The enumerate, filter, map, zip,
+    batched and windowed objects of the pipeline have their inputs and their
+    function or predicate wrapped; any other iterator is counted and timed
+    as a whole.  The pipeline must not be used directly afterwards.
+    The stats() method of the returned iterator gives a tree of dicts, one
+    per stage, with the items it took in and gave out, the time spent in it
+    (including its inputs), in its function, and waiting on its inputs, and
+    the selectivity of filters; dump("json") or dump("table") formats it.
+    Iterators which are not instrumented run at full speed.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    return _instrument(iter(iterator))
+
 def isinstance(object, types):
     """isinstance(object, class-or-type-or-tuple) -> bool
 
@@ -590,22 +1515,38 @@ def issubclass(cls, classes):
     return False
 
 @_argument
-def iter(iterable, *sentinel):
+def iter(iterable, *sentinel, buffersize=None, buffers=2):
     """iter(iterable) -> iterator
     iter(callable, sentinel) -> iterator
+    iter(readinto, sentinel, buffersize=size[, buffers=count]) -> iterator
 
     Get an iterator from an object.  In the first form, the argument must
     supply its own iterator, or be a sequence.
     In the second form, the callable is called until it returns the sentinel.
+    In the third form, readinto is a method such as file.readinto(), and
+    sentinel must be b"" or 0.  It is called with one of 'buffers' (default
+    2) preallocated buffers of buffersize bytes until it reads nothing, and
+    memoryview slices of the data read are returned: no bytes object is
+    created per chunk.  A view is only valid until 'buffers' more chunks
+    have been read, as its buffer is then reused; use bytes(view) to keep
+    the data for longer.
 
     Changes over built-in function:
     + Support for the 'sentinel' keyword argument as well as parameter
+    + Support for the 'buffersize' and 'buffers' keyword arguments
     """
 
+    if buffersize is not None:
+        if not sentinel:
+            raise TypeError("iter() needs a sentinel when buffersize is given")
+        if sentinel[0] != b"" and sentinel[0] != 0:
+            raise ValueError("iter() sentinel must be b'' or 0 when buffersize is given")
+        if buffersize < 1 or buffers < 1:
+            raise ValueError("iter() buffersize and buffers must be greater than 0")
+        return _iter_readinto(iterable, buffersize, buffers)
+
     if sentinel:
-        it = _iter(iterable, sentinel[0])
-        it.send(None)
-        return it
+        return callable_iterator(iterable, sentinel[0])
 
     if hasattr(type(iterable), "__iter__"):
         return type(iterable).__iter__(iterable)
@@ -717,6 +1658,40 @@ def oct(number):
 
     return "0o" + _change_base(number, 8)
 
+def open(file, mode="r", buffering=-1, encoding=None, errors=None, newline=None,
+         closefd=True, opener=None, *, mmap=False, advice=None):
+    """open(file, mode='r', buffering=-1, encoding=None, errors=None, newline=None, closefd=True, opener=None, *, mmap=False, advice=None) -> file object
+
+    Open file and return a stream.  Raise OSError upon failure.
+    This is the pure Python open() of the _pyio module; see its help for the
+    meaning of the arguments.
+
+    With mmap=True, file is opened for reading in binary mode ("rb") and
+    mapped into memory, giving an mmapfile object: read() and readline()
+    return memoryview slices of the mapping instead of copies, as does
+    iterating over the lines.  advice ("normal", "sequential", "random" or
+    "willneed") is given to the operating system as a hint of how the file
+    will be read, where supported.
+
+    Changes over built-in function:
+    + Support for the 'mmap' and 'advice' keyword arguments
+    """
+
+    if not mmap:
+        if advice is not None:
+            raise ValueError("advice is only used with mmap=True")
+        return _open(file, mode, buffering, encoding, errors, newline, closefd, opener)
+
+    if sorted(mode) != ["b", "r"]:
+        raise ValueError("mmap=True needs mode 'rb', not %r" % (mode,))
+    if encoding is not None:
+        raise ValueError("binary mode doesn't take an encoding argument")
+    if errors is not None:
+        raise ValueError("binary mode doesn't take an errors argument")
+    if newline is not None:
+        raise ValueError("binary mode doesn't take a newline argument")
+    return mmapfile(file, closefd=closefd, opener=opener, advice=advice)
+
 def ord(char):
     """ord(c) -> integer
 
@@ -794,6 +1769,21 @@ def repr(object):
 
     return type(object).__repr__(object)
 
+def resume(iterator, state):
+    """resume(iterator, state) -> iterator
+
+    Move an iterator pipeline to the position saved by checkpoint(), and
+    return it.  The pipeline must be built the same way as the one which was
+    saved, over the same sources; sequences and ranges are moved to their
+    index and files are seek()ed to their offset, so no item is read again.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    _resume(iterator, state)
+    return iterator
+
 @_argument
 def round(number, *ndigits):
     """round(number[, ndigits]) -> number
@@ -829,9 +1819,16 @@ def sorted(iterable, *, key=None, reverse=False):
     """sorted(iterable, key=None, reverse=False) --> new sorted list
 
     Changes over built-in function:
-    None
+    + Ranges are not sorted, only reversed if needed
     """
 
+    values = _as_builtin_range(iterable) if key is None else None
+    if values is not None:
+        new = list(values)
+        if (values.step < 0) != bool(reverse):
+            new.reverse()
+        return new
+
     new = list(iterable)
     new.sort(key=key, reverse=reverse)
     return new
@@ -847,6 +1844,8 @@ def sum(*iterable, start=0):
     + Support for an arbitrary number of parameters
 
     sum(a, b, c) == sum((a, b, c))
+
+    + Ranges of integers are summed in constant time
     """
 
     if isinstance(start, str):
@@ -858,6 +1857,14 @@ def sum(*iterable, start=0):
     if len(iterable) == 1:
         iterable = iterable[0]
 
+    values = _as_builtin_range(iterable)
+    if values is not None and isinstance(start, int):
+        # closed form of an arithmetic progression; exact, as n * (first + last) is even
+        if not values:
+            return start
+        length = _range_length(values.start, values.stop, values.step) # len() overflows past sys.maxsize
+        return start + length * (values[0] + values[-1]) // 2
+
     for item in iterable:
         start += item
     return start
@@ -990,19 +1997,27 @@ class classmethod:
         """Initialize self. See help(type(self)) for accurate signature."""
         self.__isabstractmethod__ = bool(getattr(function, "__isabstractmethod__", False))
         self.__func__ = function
+        self._owner = None
+        self._bound = None
 
-    def __get__(self, instance, owner):
-        """Return an attribute of instance, which is of type owner."""
-        def inner(*args, **kwargs):
-            return self.__func__(owner, *args, **kwargs)
+    def __set_name__(self, owner, name):
+        """Method called when the owner class is created."""
+        # the bound method for the defining class is built once and reused;
+        # re-running the class body (or reusing the descriptor) resets it
+        self._owner = owner
+        self._bound = None
 
-        inner.__name__ = self.__func__.__name__
-        inner.__doc__ = self.__func__.__doc__
-
-        if _sys.version_info >= (3, 3):
-            inner.__qualname__ = self.__func__.__qualname__
+    def __get__(self, instance, owner=None):
+        """Return an attribute of instance, which is of type owner."""
+        if owner is None:
+            owner = type(instance)
+        if owner is not self._owner:
+            return method(self.__func__, owner)
 
-        return inner
+        bound = self._bound
+        if bound is None or bound.__func__ is not self.__func__:
+            bound = self._bound = method(self.__func__, owner)
+        return bound
 
     @getset_descriptor
     def __isabstractmethd__(self):
@@ -1136,6 +2151,133 @@ class property:
     def fdel(self):
         return self
 
+class cached_property:
+    """cached_property(func, ttl=None) -> caching property attribute
+
+    Like property with only a getter, except that func is called once per
+    instance and the result is returned by every later access:
+
+    class C(object):
+        @cached_property
+        def x(self):
+            "I am the 'x' property."
+            return expensive_computation(self)
+
+    The value is stored in the instance's __dict__ under the same name, so
+    later accesses never reach the descriptor.  Instances without a __dict__
+    (using __slots__), and all instances when ttl is given, keep the value in
+    a side table instead; those instances must support weak references.
+
+    Concurrent first accesses to the same instance take a per-instance lock,
+    so func is only called once.  If ttl is given, a value older than ttl
+    seconds is computed again on the next access.  C.x.invalidate(instance)
+    drops the cached value; for values in __dict__, del instance.x works too.
+
+    Changes over functools.cached_property:
+    + Per-instance locking
+    + Support for __slots__, ttl and invalidate()
+    """
+
+    def __init__(self, func, ttl=None):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.__isabstractmethod__ = bool(getattr(func, "__isabstractmethod__", False))
+        self.func = func
+        self.ttl = ttl
+        self.attrname = None
+        self.__doc__ = func.__doc__
+        self._table = {}
+        self._locks = {}
+        self._locks_lock = _thread.allocate_lock()
+
+    def __set_name__(self, owner, name):
+        """Method called when the owner class is created."""
+        if self.attrname is None:
+            self.attrname = name
+        elif name != self.attrname:
+            raise TypeError("cannot assign the same cached_property to two different names (%r and %r)" % (self.attrname, name))
+
+    def __get__(self, instance, owner=None):
+        """Return an attribute of instance, which is of type owner."""
+        if instance is None:
+            return self
+        if self.attrname is None:
+            raise TypeError("cannot use cached_property instance without calling __set_name__ on it")
+
+        value = self._load(instance)
+        if value is not _missing:
+            return value
+
+        key = id(instance)
+        with self._locks_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = [_thread.RLock(), 0]
+            lock[1] += 1
+
+        try:
+            with lock[0]:
+                value = self._load(instance)
+                if value is _missing:
+                    value = self.func(instance)
+                    self._store(instance, value)
+        finally:
+            with self._locks_lock:
+                lock[1] -= 1
+                if not lock[1]:
+                    del self._locks[key]
+
+        return value
+
+    def _load(self, instance):
+        """Return the cached value, or _missing."""
+        if self.ttl is None:
+            try:
+                return instance.__dict__.get(self.attrname, _missing)
+            except AttributeError:
+                pass
+
+        entry = self._table.get(id(instance))
+        if entry is None or entry[0]() is not instance:
+            return _missing
+        if entry[2] is not None and entry[2] <= _time.monotonic():
+            return _missing
+        return entry[1]
+
+    def _store(self, instance, value):
+        """Cache value for instance."""
+        if self.ttl is None:
+            try:
+                instance.__dict__[self.attrname] = value
+            except AttributeError:
+                pass
+            else:
+                return
+
+        key = id(instance)
+        table = self._table
+
+        def forget(ref):
+            if table.get(key, (None,))[0] is ref:
+                del table[key]
+
+        try:
+            ref = _weakref.ref(instance, forget)
+        except TypeError:
+            raise TypeError("cannot cache %r: %r instances have no __dict__ and do not support weak references"
+                            % (self.attrname, type(instance).__name__)) from None
+
+        deadline = None if self.ttl is None else _time.monotonic() + self.ttl
+        table[key] = (ref, value, deadline)
+
+    def invalidate(self, instance):
+        """Drop the value cached for instance, if any."""
+        if self.ttl is None:
+            try:
+                instance.__dict__.pop(self.attrname, None)
+            except AttributeError:
+                pass
+        self._table.pop(id(instance), None)
+
 # special classes
 
 class code:
@@ -1151,6 +2293,31 @@ class code:
     + is_code static method, to detect if an object is a code object
     """
 
+    __slots__ = {"co_argcount": "The number of positional arguments.",
+                 "co_kwonlyargcount": "The number of keyword-only arguments.",
+                 "co_nlocals": "Equivalent to len(co_varnames).",
+                 "co_stacksize": "How many stacks are needed to execute the bytecode.",
+                 "co_flags": "The code flags, a bitmask of CO_* values (see below).",
+                 "co_code": "Compiled bytecode.",
+                 "co_consts": "Constants used in the code.",
+                 "co_names": "Functions and other names used in the code.",
+                 "co_varnames": "All the variable names used, including the arguments.",
+                 "co_filename": "Filename the function was defined in.",
+                 "co_name": "Name of the function.",
+                 "co_firstlineno": "The line at which the function begins.",
+                 "co_lnotab": "Mapping of lines to indents.",
+                 "co_freevars": "Variables used in the function but defined outside of it.",
+                 "co_cellvars": "Variables used in nested scopes."}
+
+    # co_flags values:
+    # 1  = CO_OPTIMIZED   - Code is optimized
+    # 2  = CO_NEWLOCALS   - Create a new local scope
+    # 4  = CO_VARARGS     - Use of *args
+    # 8  = CO_VARKEYWORDS - Use of **kwargs
+    # 16 = CO_NESTED      - Function is nested
+    # 32 = CO_GENERATOR   - Function is a generator
+    # 64 = CO_NOFREE      - No space left to modify bytecode (?)
+
     def __init__(self, argcount, kwonlyargcount, nlocals, stacksize, flags,
                  codestring, constants, names, varnames, filename, name,
                  firstlineno, lnotab, freevars=(), cellvars=()):
@@ -1203,77 +2370,17 @@ class code:
 
         return True
 
-    @member_descriptor
-    def co_argcount(self):
-        """The number of positional arguments."""
-
-    @member_descriptor
-    def co_kwonlyargcount(self):
-        """The number of keyword-only arguments."""
-
-    @member_descriptor
-    def co_nlocals(self):
-        """Equivalent to len(co_varnames)."""
-
-    @member_descriptor
-    def co_stacksize(self):
-        """How many stacks are needed to execute the bytecode."""
-
-    @member_descriptor
-    def co_flags(self):
-        """The code flags. As follow:
-
-        1  = CO_OPTIMIZED   - Code is optimized
-        2  = CO_NEWLOCALS   - Create a new local scope
-        4  = CO_VARARGS     - Use of *args
-        8  = CO_VARKEYWORDS - Use of **kwargs
-        16 = CO_NESTED      - Function is nested
-        32 = CO_GENERATOR   - Function is a generator
-        64 = CO_NOFREE      - No space left to modify bytecode (?)
-        """
-
-    @member_descriptor
-    def co_code(self):
-        """Compiled bytecode."""
-
-    @member_descriptor
-    def co_consts(self):
-        """Constants used in the code."""
-
-    @member_descriptor
-    def co_names(self):
-        """Functions and other names used in the code."""
-
-    @member_descriptor
-    def co_varnames(self):
-        """All the variable names used, including the arguments."""
-
-    @member_descriptor
-    def co_filename(self):
-        """Filename the function was defined in."""
-
-    @member_descriptor
-    def co_name(self):
-        """Name of the function."""
-
-    @member_descriptor
-    def co_firstlineno(self):
-        """The line at which the function begins."""
-
-    @member_descriptor
-    def co_lnotab(self):
-        """Mapping of lines to indents."""
-
-    @member_descriptor
-    def co_freevars(self):
-        """Variables used in the function but defined outside of it."""
-
-    @member_descriptor
-    def co_cellvars(self):
-        """Variables used in nested scopes."""
-
 class frame:
 
+    __slots__ = {"f_back": "This frame's caller.",
+                 "f_builtins": "Built-in scope seen by this frame.",
+                 "f_code": "Code object ran by this frame.",
+                 "f_globals": "Global scope seen by this frame.",
+                 "f_lasti": "Last index attempted in bytecode.",
+                 "f_lineno": "Line number where frame begins (?).",
+                 "f_locals": "Local scope seen by this frame.",
+                 "f_trace": "Tracing function for this frame, or None."}
+
     def __init__(self, caller, builtins, code, globals,
                  lasti, lineno, locals, trace=None):
 
@@ -1307,40 +2414,13 @@ class frame:
 
         return True
 
-    @member_descriptor
-    def f_back(self):
-        """This frame's caller."""
-
-    @member_descriptor
-    def f_builtins(self):
-        """Built-in scope seen by this frame."""
-
-    @member_descriptor
-    def f_code(self):
-        """Code object ran by this frame."""
-
-    @member_descriptor
-    def f_globals(self):
-        """Global scope seen by this frame."""
-
-    @member_descriptor
-    def f_lasti(self):
-        """Last index attempted in bytecode."""
-
-    @member_descriptor
-    def f_lineno(self):
-        """Line number where frame begins (?)."""
-
-    @member_descriptor
-    def f_locals(self):
-        """Local scope seen by this frame."""
-
-    @member_descriptor
-    def f_trace(self):
-        """Tracing function for this frame, or None."""
-
 class traceback:
 
+    __slots__ = {"tb_frame": "Frame object associated with this traceback.",
+                 "tb_lasti": "Last index attempted in bytecode.",
+                 "tb_lineno": "Line number where error occurred.",
+                 "tb_next": "Inner traceback level (called by this level)."}
+
     def __init__(self, frame, lasti, lineno, next=None):
         self.tb_frame = frame
         self.tb_lasti = lasti
@@ -1363,24 +2443,10 @@ class traceback:
 
         return True
 
-    @member_descriptor
-    def tb_frame(self):
-        """Frame object associated with this traceback."""
-
-    @member_descriptor
-    def tb_lasti(self):
-        """Last index attempted in bytecode."""
-
-    @member_descriptor
-    def tb_lineno(self):
-        """Line number where error occurred."""
-
-    @member_descriptor
-    def tb_next(self):
-        """Inner traceback level (called by this level)."""
-
 class cell:
 
+    __slots__ = {"cell_contents": "Contents of the cell."}
+
     def __init__(self, contents):
         self.cell_contents = contents
 
@@ -1400,10 +2466,6 @@ class cell:
     def is_cell(cell):
         return hasattr(cell, "cell_contents")
 
-    @getset_descriptor
-    def cell_contents(self):
-        """Contents of the cell."""
-
 class function:
     """function(code, globals[, name[, argdefs[, closure]]])
 
@@ -1565,12 +2627,28 @@ class method:
     Create a bound instance method object.
     """
 
+    __slots__ = {"__func__": "The function associated with the method.",
+                 "__self__": "The instance associated with the method."}
+
     def __init__(self, function, instance):
         self.__func__ = function
         self.__self__ = instance
 
     def __call__(self, *args, **kwargs):
-        return self.__func__(self.__self__, *args, **kwargs)
+        # the slots are read directly, without going through __getattribute__
+        return _method_function(self)(_method_instance(self), *args, **kwargs)
+
+    def __getattribute__(self, name):
+        # found on the class, where __getattr__ would not forward them
+        if name == "__doc__" or name == "__module__":
+            return getattr(object.__getattribute__(self, "__func__"), name, None)
+        return object.__getattribute__(self, name)
+
+    def __getattr__(self, name):
+        # __name__, __qualname__ and the like come from the function
+        if name in type(self).__slots__:
+            raise AttributeError(name)
+        return getattr(self.__func__, name)
 
     def to_method(met):
         return met.to_method.__class__(met.__func__, met.__self__)
@@ -1588,13 +2666,8 @@ class method:
 
         return True
 
-    @member_descriptor
-    def __func__(self):
-        """The function associated with the method."""
-
-    @member_descriptor
-    def __self__(self):
-        """The instance associated with the method."""
+_method_function = method.__dict__["__func__"].__get__
+_method_instance = method.__dict__["__self__"].__get__
 
 class generator:
     """generator(code)
@@ -1673,6 +2746,131 @@ class generator:
     def gi_frame(self):
         """Frame object or possibly None once the generator has been exhausted."""
 
+class callable_iterator:
+    """callable_iterator(callable, sentinel)
+
+    Iterator calling callable until it returns sentinel, as returned by
+    iter(callable, sentinel).
+
+    Changes over built-in class:
+    + __checkpoint__ and __resume__ methods, when callable is a method of a
+      file, to save and restore its offset
+    """
+
+    __slots__ = {"callable": "Function called for each item, or None once exhausted.",
+                 "sentinel": "Value ending the iteration."}
+
+    def __init__(self, callable, sentinel):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.callable = callable
+        self.sentinel = sentinel
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        if self.callable is None:
+            raise StopIteration
+        result = self.callable()
+        if result is self.sentinel or result == self.sentinel:
+            self.callable = None
+            raise StopIteration
+        return result
+
+    def __checkpoint__(self):
+        """Return the offset of the file read by the callable, or None once exhausted."""
+        if self.callable is None:
+            return None
+        owner = getattr(self.callable, "__self__", None)
+        if not hasattr(owner, "tell"):
+            raise TypeError("cannot checkpoint iter() over %r" % (self.callable,))
+        return owner.tell()
+
+    def __resume__(self, state):
+        """Seek the file read by the callable to the offset from __checkpoint__()."""
+        if state is None:
+            self.callable = None
+        else:
+            self.callable.__self__.seek(state)
+
+    def __reduce__(self):
+        """Return state information for pickling."""
+        if self.callable is None:
+            return iter, ((),)
+        return iter, (self.callable, self.sentinel)
+
+class range_iterator:
+    """range_iterator(start, step, length)
+
+    Iterator over the values of a range object, computing each value from
+    its index.
+
+    Changes over built-in class:
+    + __next_chunk__ method, filling a list of several values at once
+    + __checkpoint__ and __resume__ methods, used by checkpoint() and resume()
+    """
+
+    __slots__ = {"start": "First value.",
+                 "step": "Difference between two consecutive values.",
+                 "length": "Number of values.",
+                 "index": "Index of the next value."}
+
+    def __init__(self, start, step, length):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.start = start
+        self.step = step
+        self.length = length
+        self.index = 0
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        index = self.index
+        if index >= self.length:
+            raise StopIteration
+        self.index = index + 1
+        return self.start + index * self.step
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        index = self.index
+        end = index + size if index + size < self.length else self.length
+        if index >= end:
+            return []
+        self.index = end
+        first = self.start + index * self.step
+        try:
+            return list(_builtin_range(first, first + (end - index) * self.step, self.step))
+        except TypeError: # not integers
+            return [first + offset * self.step for offset in _builtin_range(end - index)]
+
+    def __length_hint__(self):
+        """Private method returning an estimate of len(list(it))."""
+        return self.length - self.index if self.index < self.length else 0
+
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        return self.index
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        self.__setstate__(state)
+
+    def __reduce__(self):
+        """Return state information for pickling."""
+        return type(self), (self.start, self.step, self.length), self.index
+
+    def __setstate__(self, state):
+        """Set state information for unpickling."""
+        if state < 0:
+            state = 0
+        self.index = state if state < self.length else self.length
+
 class module:
     """module(name [,doc])
 
@@ -1794,13 +2992,20 @@ class enumerate:
         (0, seq[0]), (1, seq[1]), (2, seq[2]), ...
 
     Changes over built-in type:
-    None
+    + __next_chunk__ method, to get a list of several pairs at once
+    + __length_hint__ method, when the iterable gives a length or a hint
+    + __checkpoint__ and __resume__ methods, used by checkpoint() and resume()
     """
 
+    __slots__ = {"iterator": "Iterator over the wrapped iterable.",
+                 "index": "Count returned with the next item.",
+                 "_next": "Bound __next__ method of the iterator."}
+
     def __init__(self, iterable, start=0):
         """Initialize self. See help(type(self)) for accurate signature."""
         self.iterator = iter(iterable)
         self.index = start
+        self._next = self.iterator.__next__
 
     def __iter__(self):
         """Implement iter(self)."""
@@ -1808,22 +3013,44 @@ class enumerate:
 
     def __next__(self):
         """Implement next(self)."""
-        if self.index >= self.length:
-            raise StopIteration
-        self.index += 1
-        return self.index - 1, next(self.iterator)
+        item = self._next()
+        index = self.index
+        self.index = index + 1
+        return index, item
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        chunk = []
+        index = self.index
+        for item in _next_chunk(self.iterator, size):
+            chunk.append((index, item))
+            index += 1
+        self.index = index
+        return chunk
 
-    def __reduce__(self):
-        """Return state information for pickling."""
-        return type(self), (self.iterator, self.index)
+    def __length_hint__(self):
+        """Private method returning an estimate of len(list(it))."""
+        hint = _length_hint(self.iterator)
+        return NotImplemented if hint is None else hint
 
-    @getset_descriptor
-    def iterator(self):
-        return iter([])
+    def __instrument__(self):
+        """Wrap the input of self for instrument(); return (inputs, timer)."""
+        probe = self.iterator = _instrument(self.iterator)
+        self._next = probe.__next__
+        return (probe,), None
 
-    @getset_descriptor
-    def index(self):
-        return 0
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        return self.index, _checkpoint(self.iterator)
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        self.index, state = state
+        _resume(self.iterator, state)
+
+    def __reduce__(self):
+        """Return state information for pickling."""
+        return type(self), (self.iterator, self.index)
 
 class filter:
     """filter(function or None, iterable) --> filter object
@@ -1832,13 +3059,19 @@ class filter:
     is true. If function is None, return the items that are true.
 
     Changes over built-in type:
-    None
+    + __next_chunk__ method, to get a list of several items at once
+    + __checkpoint__ and __resume__ methods, used by checkpoint() and resume()
     """
 
+    __slots__ = {"callable": "Predicate, or None to test the items themselves.",
+                 "iterator": "Iterator over the wrapped iterable.",
+                 "_next": "Bound __next__ method of the iterator."}
+
     def __init__(self, callable, iterable):
         """Initialize self. See help(type(self)) for accurate signature."""
         self.callable = callable
         self.iterator = iter(iterable)
+        self._next = self.iterator.__next__
 
     def __iter__(self):
         """Implement iter(self)."""
@@ -1847,37 +3080,318 @@ class filter:
     def __next__(self):
         """Implement next(self)."""
         caller = bool if self.callable is None else self.callable
-        value = next(self.iterator)
-        if caller(value):
-            return value
-        return next(self)
+        next_item = self._next
+        while True:
+            value = next_item()
+            if caller(value):
+                return value
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        if type(self._next) is _pushback:
+            chunk = _next_chunk_held(self, size, (self._next,))
+            if chunk is not None:
+                return chunk
+            self._next = self._next.next
+
+        caller = bool if self.callable is None else self.callable
+        chunk = []
+        while len(chunk) < size:
+            # never ask for more than is still needed, so nothing is read ahead
+            values = _next_chunk(self.iterator, size - len(chunk))
+            if not values:
+                break
+            flags = []
+            error = None
+            try:
+                flags.extend(_builtin_map(caller, values))
+            except Exception as exc:
+                error = exc
+            chunk.extend([value for value, flag in _builtin_zip(values, flags) if flag])
+            if len(flags) < len(values):
+                # the predicate raised at the value after the flags: keep the
+                # values read after it for the next calls, as in map
+                self._next = _pushback(values[len(flags) + 1:], None, self._next)
+                if chunk:
+                    self._next.error = StopIteration() if error is None else error
+                elif error is not None:
+                    raise error
+                break
+        return chunk
+
+    def __instrument__(self):
+        """Wrap the input and predicate of self for instrument(); return (inputs, timer)."""
+        probe = self.iterator = _instrument(self.iterator)
+        self._next = probe.__next__
+        if self.callable is not None:
+            self.callable = _timer(self.callable)
+        return (probe,), self.callable
+
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        if _holding((self._next,)):
+            raise TypeError("cannot checkpoint a filter object holding items read before an error")
+        return _checkpoint(self.iterator)
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        _resume(self.iterator, state)
+        self._next = self.iterator.__next__ # drop any held item
 
     def __reduce__(self):
         """Return state information for pickling."""
         return type(self), (self.callable, self.iterator)
 
-    @getset_descriptor
-    def callable(self):
-        return bool
+class distinct:
+    """distinct(iterable, key=None, mode="exact", capacity=None, error_rate=0.01, path=None) --> distinct object
+
+    Return an iterator yielding the items of iterable whose key (the item
+    itself if key is None) was not seen before.  Keys are compared through
+    a 128-bit digest, so they must be None, numbers, strings, bytes, or
+    tuples or frozensets of them; other keys raise TypeError.
+    With mode="exact", 64 bits of each digest are kept in an array-backed
+    hash set, 12 to 24 bytes per distinct key (the table is at most two
+    thirds full, and doubles); two different keys are taken for the same
+    one with a probability of about n**2 / 2**65 for n keys (0.03% for
+    10**8 keys).  Unlike a set, which keeps apart distinct NaN objects, all
+    NaNs are taken for the same key.  capacity, if given, sizes the set up front.
+    With mode="bloom", a Bloom filter sized for capacity keys is used
+    instead, with memory fixed up front: new keys are dropped as already
+    seen with a probability of about error_rate, once capacity keys have
+    been seen.  Its bits are kept in a bytearray, or in the file at path if
+    given, mapped into memory; a filter left in the file by a previous run
+    with the same capacity and error_rate goes on from its keys; call
+    close() (or use the object as a context manager) to write it back.
+    nbytes gives the memory used to remember the keys.
 
-    @getset_descriptor
-    def iterator(self):
-        return iter([])
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"iterator": "Iterator over the wrapped iterable.",
+                 "key": "Function giving the key of an item, or None.",
+                 "mode": "'exact' or 'bloom'.",
+                 "_next": "Bound __next__ method of the iterator.",
+                 "_seen": "Set of the digests of the keys seen."}
+
+    def __init__(self, iterable, key=None, mode="exact", capacity=None, error_rate=0.01, path=None):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        if mode == "exact":
+            if path is not None:
+                raise ValueError("path is only used with mode='bloom'")
+            self._seen = _digestset(capacity or 8)
+        elif mode == "bloom":
+            if capacity is None or capacity < 1:
+                raise ValueError("mode='bloom' needs a capacity of at least one")
+            if not 0 < error_rate < 1:
+                raise ValueError("error_rate must be between 0 and 1")
+            self._seen = _bloom(capacity, error_rate, path)
+        else:
+            raise ValueError("mode must be 'exact' or 'bloom', not %r" % (mode,))
+
+        self.iterator = iter(iterable)
+        self.key = key
+        self.mode = mode
+        self._next = self.iterator.__next__
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        key = self.key
+        add = self._seen.add
+        next_item = self._next
+        while True:
+            item = next_item()
+            if add(_digest(item if key is None else key(item))):
+                return item
+
+    @property
+    def nbytes(self):
+        """Number of bytes used to remember the keys."""
+        return self._seen.nbytes
+
+    def close(self):
+        """Write the Bloom filter to its file and unmap it, if there is one."""
+        close = getattr(getattr(self, "_seen", None), "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+class _digestset:
+    """Open-addressing hash set of 64-bit digests, in an array."""
+
+    __slots__ = ("table", "mask", "used")
+
+    def __init__(self, capacity):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        size = 8
+        while size * 2 < capacity * 3: # at most two thirds full
+            size *= 2
+        self.table = _array.array("Q", bytes(8 * size)) # 0 is an empty slot
+        self.mask = size - 1
+        self.used = 0
+
+    def add(self, digest):
+        """Add digest to the set, and return whether it was not in it yet."""
+        digest = (digest & 0xFFFFFFFFFFFFFFFF) or 1
+        table, mask = self.table, self.mask
+        index = digest & mask
+        while True: # linear probing
+            value = table[index]
+            if value == digest:
+                return False
+            if not value:
+                break
+            index = (index + 1) & mask
+
+        table[index] = digest
+        self.used += 1
+        if self.used * 3 > len(table) * 2:
+            self._grow()
+        return True
+
+    def _grow(self):
+        """Double the size of the table."""
+        old = self.table
+        self.table = table = _array.array("Q", bytes(16 * len(old)))
+        self.mask = mask = len(table) - 1
+        for digest in old:
+            if digest:
+                index = digest & mask
+                while table[index]:
+                    index = (index + 1) & mask
+                table[index] = digest
+
+    @property
+    def nbytes(self):
+        """Number of bytes used by the table."""
+        return self.table.itemsize * len(self.table)
+
+class _bloom:
+    """Bloom filter of 128-bit digests, in a bytearray or a memory-mapped file."""
+
+    __slots__ = ("bits", "size", "hashes", "_file")
+
+    def __init__(self, capacity, error_rate, path):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        import math
+
+        # optimal number of bits and of hash functions for the error rate
+        self.size = int(-capacity * math.log(error_rate) / math.log(2) ** 2) + 1
+        self.hashes = int(round(self.size / capacity * math.log(2))) or 1
+        nbytes = (self.size + 7) // 8
+        self._file = None
+        if path is None:
+            self.bits = bytearray(nbytes)
+            return
+
+        import mmap
+        file = _os.open(path, _os.O_RDWR | _os.O_CREAT, 0o666)
+        try:
+            length = _os.fstat(file).st_size
+            if not length:
+                _os.ftruncate(file, nbytes)
+            elif length != nbytes:
+                raise ValueError("%r holds a Bloom filter of %i bytes, not %i; "
+                                 "use the same capacity and error_rate" % (path, length, nbytes))
+            self.bits = mmap.mmap(file, nbytes)
+        except BaseException:
+            _os.close(file)
+            raise
+        self._file = file
+
+    def add(self, digest):
+        """Add digest to the filter, and return whether it was not in it yet."""
+        bits, size = self.bits, self.size
+        first = digest & 0xFFFFFFFFFFFFFFFF
+        step = (digest >> 64) | 1 # double hashing gives the other positions
+        new = False
+        count = self.hashes
+        while count:
+            position = first % size
+            mask = 1 << (position & 7)
+            byte = bits[position >> 3]
+            if not byte & mask:
+                bits[position >> 3] = byte | mask
+                new = True
+            first += step
+            count -= 1
+        return new
+
+    @property
+    def nbytes(self):
+        """Number of bytes used by the bits."""
+        return len(self.bits)
+
+    def close(self):
+        """Write the bits to the file and unmap it."""
+        if self._file is not None:
+            self.bits.flush()
+            self.bits.close()
+            _os.close(self._file)
+            self._file = None
 
 class map:
     """map(func, *iterables) --> map object
+    map(func, *iterables, workers=N[, executor][, ordered][, prefetch][, chunksize])
 
     Make an iterator that computes the function using arguments from
     each of the iterables.  Stops when the shortest iterable is exhausted.
 
+    With workers, the function runs in a pool of N threads (executor="thread",
+    the default) or processes (executor="process").  The inputs are read
+    lazily, chunksize items at a time (default 1 for threads, 64 for
+    processes), with at most prefetch chunks in flight (default 2 * workers).
+    Results come back in input order, or in completion order when ordered is
+    false.  An exception raised by the function is re-raised by next(), after
+    the results before it, with a note giving the index of its item.  Call
+    close() (or use the object as a context manager) to stop the workers
+    when not consuming everything.
+
     Changes from the built-in type:
-    None
+    + __next_chunk__ method, to get a list of several results at once
+    + __length_hint__ method, when all the iterables give a length or a hint
+    + __checkpoint__ and __resume__ methods, used by checkpoint() and resume()
+    + Support for the 'workers', 'executor', 'ordered', 'prefetch' and
+      'chunksize' keyword arguments, to run the function in a pool
     """
 
-    def __init__(self, func, *iterables):
+    __slots__ = {"function": "Function applied to the items.",
+                 "iterators": "Iterators over the wrapped iterables.",
+                 "_next": "Bound __next__ method of the only iterator, or None.",
+                 "_nexts": "Bound __next__ methods of the iterators.",
+                 "_args": "Argument list reused by every step, None while in use."}
+
+    def __new__(cls, func, *iterables, workers=None, **options):
+        """Create and return a new object. See help(type) for accurate signature."""
+        if workers is None:
+            if options:
+                raise TypeError("map() got %r without workers" % sorted(options)[0])
+        elif cls is map:
+            cls = _pool_map
+        elif not issubclass(cls, _pool_map):
+            raise TypeError("%s() does not support workers; only map() itself runs in a pool"
+                            % cls.__name__)
+        return object.__new__(cls)
+
+    def __init__(self, func, *iterables, workers=None):
         """Initialize self. See help(type(self)) for accurate signature."""
         self.function = func
         self.iterators = tuple(iter(iterable) for iterable in iterables)
+        self._nexts = tuple(iterator.__next__ for iterator in self.iterators)
+        self._next = self._nexts[0] if len(self._nexts) == 1 else None
+        self._args = [None] * len(self._nexts)
 
     def __iter__(self):
         """Implement iter(self)."""
@@ -1885,28 +3399,219 @@ class map:
 
     def __next__(self):
         """Implement next(self)."""
-        args = []
+        if self._next is not None:
+            return self.function(self._next())
+
+        args = _take_args(self)
+        index = 0
+        for next_item in self._nexts:
+            args[index] = next_item() # on StopIteration, the list is dropped
+            index += 1
+
+        self._args = args
+        return self.function(*args)
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        if not self._nexts:
+            return []
+        if type(self._nexts[0]) is _pushback:
+            chunk = _next_chunk_held(self, size, self._nexts)
+            if chunk is not None:
+                return chunk
+            self._nexts = tuple([pushback.next for pushback in self._nexts])
+            self._next = self._nexts[0] if len(self._nexts) == 1 else None
+
+        columns = _next_chunk_columns(self.iterators, size)
+        if not columns:
+            return []
+        inputs = [iter(column) for column in columns]
+        results = []
+        error = None
+        try:
+            results.extend(_builtin_map(self.function, *inputs))
+        except Exception as exc:
+            error = exc
+        if len(results) < len(columns[0]):
+            # the function raised at the item after the results (StopIteration
+            # ends extend() silently): keep the arguments read after that item
+            # for the next calls, and raise on the next call if results are left
+            self._nexts = tuple([_pushback(list(input), None, next_item)
+                                 for input, next_item in _builtin_zip(inputs, self._nexts)])
+            self._next = self._nexts[0] if len(self._nexts) == 1 else None
+            if results:
+                self._nexts[0].error = StopIteration() if error is None else error
+            elif error is not None:
+                raise error
+        return results
+
+    def __length_hint__(self):
+        """Private method returning an estimate of len(list(it))."""
+        result = None
         for iterator in self.iterators:
-            try:
-                args.append(next(iterator))
-            except StopIteration:
-                break
+            hint = _length_hint(iterator)
+            if hint is None:
+                return NotImplemented
+            if result is None or hint < result:
+                result = hint
+        return NotImplemented if result is None else result
+
+    def __instrument__(self):
+        """Wrap the inputs and function of self for instrument(); return (inputs, timer)."""
+        probes = self.iterators = tuple([_instrument(iterator) for iterator in self.iterators])
+        self._nexts = tuple([probe.__next__ for probe in probes])
+        self._next = self._nexts[0] if len(self._nexts) == 1 else None
+        self.function = _timer(self.function)
+        return probes, self.function
+
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        if _holding(self._nexts):
+            raise TypeError("cannot checkpoint a map object holding items read before an error")
+        return tuple([_checkpoint(iterator) for iterator in self.iterators])
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        if len(state) != len(self.iterators):
+            raise ValueError("checkpoint of a map object over %i iterables" % len(state))
+        for iterator, position in zip(self.iterators, state):
+            _resume(iterator, position)
+        if self._nexts and type(self._nexts[0]) is _pushback: # drop the held items
+            self._nexts = tuple([pushback.next for pushback in self._nexts])
+            self._next = self._nexts[0] if len(self._nexts) == 1 else None
+
+    def __reduce__(self):
+        """Return state information for pickling."""
+        return type(self), (self.function,) + self.iterators
+
+class _pool_map(map):
+    """map object running its function in a thread or process pool."""
+
+    __slots__ = ("_executor", "_pending", "_ready", "_error", "_ordered",
+                 "_prefetch", "_chunksize", "_exhausted", "_index")
+
+    def __init__(self, func, *iterables, workers=None, executor="thread",
+                 ordered=True, prefetch=None, chunksize=None):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        import collections
+        import concurrent.futures
+
+        if workers < 1:
+            raise ValueError("workers must be greater than 0")
+
+        if executor == "thread":
+            pool = concurrent.futures.ThreadPoolExecutor
+        elif executor == "process":
+            pool = concurrent.futures.ProcessPoolExecutor
         else:
-            return self.function(*args)
+            raise ValueError("executor must be 'thread' or 'process', not %r" % (executor,))
+
+        map.__init__(self, func, *iterables)
+        self._ordered = ordered
+        self._prefetch = 2 * workers if prefetch is None else prefetch
+        self._chunksize = (1 if executor == "thread" else 64) if chunksize is None else chunksize
+        self._exhausted = False
+        self._index = 0
+        self._error = None
+        self._ready = collections.deque()
+        self._pending = collections.deque()
+        self._executor = pool(workers)
+
+    def __next__(self):
+        """Implement next(self)."""
+        ready = self._ready
+        while not ready:
+            error = self._error
+            if error is not None:
+                self._error = None
+                self.close()
+                raise error
+            if self._pending is None:
+                raise StopIteration
+
+            try:
+                self._submit()
+                if not self._pending:
+                    raise StopIteration
+                results, self._error = self._collect()
+            except BaseException:
+                self.close()
+                raise
+
+            ready.extend(results)
 
-        raise StopIteration
+        return ready.popleft()
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        chunk = []
+        try:
+            while len(chunk) < size:
+                chunk.append(self.__next__())
+        except StopIteration:
+            pass
+        return chunk
 
     def __reduce__(self):
         """Return state information for pickling."""
-        return type(self), (self.function,) + self.iterators
+        raise TypeError("cannot pickle a map object using workers")
 
-    @getset_descriptor
-    def function(self):
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        raise TypeError("cannot checkpoint a map object using workers")
+
+    def __instrument__(self):
+        """Wrap the inputs of self for instrument(); return (inputs, timer)."""
+        probes, timer = map.__instrument__(self)
+        self.function = timer.function # the calls happen in the workers
+        return probes, None
+
+    def __enter__(self):
         return self
 
-    @getset_descriptor
-    def iterators(self):
-        return []
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def _submit(self):
+        """Read inputs and submit chunks until prefetch chunks are in flight."""
+        pending = self._pending
+        while not self._exhausted and len(pending) < self._prefetch:
+            if self._next is not None:
+                rows = [(item,) for item in _next_chunk(self.iterators[0], self._chunksize)]
+            else:
+                rows = _next_chunk_rows(self.iterators, self._chunksize)
+            if not rows:
+                self._exhausted = True
+                break
+            pending.append(self._executor.submit(_map_chunk, self.function, rows, self._index))
+            self._index += len(rows)
+
+    def _collect(self):
+        """Wait for the next chunk and return its (results, error) pair."""
+        pending = self._pending
+        if self._ordered:
+            return pending.popleft().result()
+
+        import concurrent.futures
+        done = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)[0]
+        for future in pending:
+            if future in done:
+                pending.remove(future)
+                return future.result()
+
+    def close(self):
+        """Stop the workers, dropping any result not returned yet."""
+        pending = getattr(self, "_pending", None)
+        if pending is None:
+            return
+        self._pending = None
+        for future in pending:
+            future.cancel()
+        self._ready.clear()
+        self._executor.shutdown(wait=False)
 
 class range:
     """range(stop) -> range object
@@ -1915,9 +3620,14 @@ class range:
     Return a virtual sequence of numbers from start to stop by step.
 
     Changes over built-in type:
-    None
+    + toarray() and tobytearray() methods, to get all the values at once
+    + __buffer__ method, so that memoryview(range) works (Python 3.12+)
     """
 
+    __slots__ = {"start": "First value of the range.",
+                 "stop": "Value at which the range stops (excluded).",
+                 "step": "Difference between two consecutive values."}
+
     def __init__(self, start, stop=None, step=1):
         """Initialize self. See help(type(self)) for accurate signature."""
         if step == 0:
@@ -1930,36 +3640,48 @@ class range:
 
     def __iter__(self):
         """Implement iter(self)."""
-        index = self.start
-        mod = "__lt__" if self.step > 0 else "__gt__"
-        while getattr(index, mod)(self.stop):
-            yield index
-            index += self.step
-        raise StopIteration
+        return range_iterator(self.start, self.step, _range_length(self.start, self.stop, self.step))
+
+    def __reversed__(self):
+        """Return a reverse iterator."""
+        length = _range_length(self.start, self.stop, self.step)
+        return range_iterator(self.start + (length - 1) * self.step, -self.step, length)
 
     def __len__(self):
         """Return len(self)."""
-        num = 0
-        for i in self:
-            num += 1
-        return num
+        return _range_length(self.start, self.stop, self.step)
+
+    def toarray(self, typecode="q"):
+        """Return the values of the range in a new array.array of typecode."""
+        values = _builtin_range(self.start, self.stop, self.step)
+        array = _array.array(typecode)
+        index = 0
+        while index < len(values): # in chunks, so no list of all the values is made
+            array.fromlist(list(values[index:index + 65536]))
+            index += 65536
+        return array
+
+    def tobytearray(self):
+        """Return the values of the range, which must be in range(256), in a new bytearray."""
+        return bytearray(_builtin_range(self.start, self.stop, self.step))
+
+    def __buffer__(self, flags):
+        """Return a buffer object that exposes the underlying memory of the object."""
+        return memoryview(self.toarray())
 
     def __getitem__(self, item):
         """Return self[key]."""
         if hasattr(item, "__index__"):
+            length = len(self)
             if item < 0:
-                item += len(self)
-            for i, value in enumerate(self):
-                if i == item:
-                    return value
-
-            raise IndexError("range object index out of range")
+                item += length
+            if not 0 <= item < length:
+                raise IndexError("range object index out of range")
+            return self.start + item * self.step
 
         if isinstance(item, (_builtin_slice, slice)):
-            start = item.start or 0
-            stop = item.stop or len(self)
-            step = item.step or 1
-            return range(start * self.step, stop * self.step, step * self.step)
+            start, stop, step = item.indices(len(self))
+            return range(self.start + start * self.step, self.start + stop * self.step, step * self.step)
 
         raise TypeError("range indices must be integers or slices, not %s" % type(item).__name__)
 
@@ -2024,17 +3746,188 @@ class range:
 
         raise ValueError("%s is not in range" % value)
 
-    @getset_descriptor
-    def start(self):
-        return 0
+# most values a rangeset expands where progressions with different steps overlap
 
-    @getset_descriptor
-    def stop(self):
-        return -1
+_rangeset_limit = 1 << 20
 
-    @getset_descriptor
-    def step(self):
-        return 1
+class rangeset:
+    """rangeset(iterable=()) -> rangeset object
+
+    Return an immutable set of integers, given by an iterable of range
+    objects and integers, and kept as a sorted index of arithmetic
+    progressions whose spans are disjoint.  A range is one progression
+    whatever its length and step, and progressions which go on from one
+    another are merged.  Where progressions with different steps overlap,
+    the overlapping part is expanded into its values, up to about a million
+    of them; past that, ValueError is raised.  The first values, ends and
+    steps are kept in three array.array('q'), so the values must fit in
+    64-bit signed integers.
+    Membership is O(log n) for n progressions, union (|), intersection (&)
+    and difference (-) are O((n + m) log(n + m)), and iteration gives the
+    values one by one without building them all; intervals() gives the
+    progressions as range objects.  tobytes() and frombytes() store them as
+    raw arrays.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"starts": "array('q') of the first value of each progression.",
+                 "stops": "array('q') of the value after the last one of each progression.",
+                 "steps": "array('q') of the step of each progression, 1 for a single value."}
+
+    def __init__(self, iterable=()):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        pieces = []
+        for item in iterable:
+            if hasattr(item, "__index__"):
+                pieces.append((item, item + 1, 1))
+                continue
+            start, stop, step = item.start, item.stop, item.step
+            if step < 0: # the same values, from the last one
+                length = _range_length(start, stop, step)
+                start, stop, step = start + (length - 1) * step, start + 1, -step
+            piece = _progression(start, stop, step)
+            if piece is not None:
+                pieces.append(piece)
+        self.starts, self.stops, self.steps = _progressions_merge(pieces)
+
+    @classmethod
+    def _from_pieces(cls, pieces):
+        """Return a rangeset over a list of progressions."""
+        self = object.__new__(cls)
+        self.starts, self.stops, self.steps = _progressions_merge(pieces)
+        return self
+
+    def _pieces(self):
+        """Return the progressions of self, as a list of triples."""
+        return list(zip(self.starts, self.stops, self.steps))
+
+    def __contains__(self, value):
+        """Return key in self."""
+        index = _bisect.bisect_right(self.starts, value) - 1
+        return index >= 0 and value < self.stops[index] and not (value - self.starts[index]) % self.steps[index]
+
+    def __len__(self):
+        """Return len(self)."""
+        total = 0
+        for start, stop, step in zip(self.starts, self.stops, self.steps):
+            total += (stop - start + step - 1) // step
+        return total
+
+    def __bool__(self):
+        """self != 0"""
+        return bool(self.starts)
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        for start, stop, step in zip(self.starts, self.stops, self.steps):
+            yield from range(start, stop, step)
+
+    def intervals(self):
+        """Return an iterator over the progressions of self, as range objects."""
+        for start, stop, step in zip(self.starts, self.stops, self.steps):
+            yield range(start, stop, step)
+
+    def union(self, other):
+        """Return the values in self or in other, as a new rangeset."""
+        return self._from_pieces(self._pieces() + other._pieces())
+
+    def intersection(self, other):
+        """Return the values in both self and other, as a new rangeset."""
+        pieces = []
+        first, second = self._pieces(), other._pieces()
+        i = j = 0
+        while i < len(first) and j < len(second):
+            common = _progression_common(first[i], second[j])[0]
+            if common is not None:
+                pieces.append(common)
+            if first[i][1] < second[j][1]:
+                i += 1
+            else:
+                j += 1
+        return self._from_pieces(pieces)
+
+    def difference(self, other):
+        """Return the values in self but not in other, as a new rangeset."""
+        pieces = []
+        second = other._pieces()
+        j = 0
+        for piece in self._pieces():
+            start, stop = piece[0], piece[1]
+            while j < len(second) and second[j][1] <= start: # entirely before
+                j += 1
+            rest = [piece]
+            k = j
+            while k < len(second) and second[k][0] < stop: # cut out the overlapping ones
+                rest = [part for kept in rest for part in _progression_difference(kept, second[k])]
+                k += 1
+            pieces.extend(rest)
+        return self._from_pieces(pieces)
+
+    def __or__(self, other):
+        """Return self|value."""
+        if not isinstance(other, rangeset):
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self, other):
+        """Return self&value."""
+        if not isinstance(other, rangeset):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        """Return self-value."""
+        if not isinstance(other, rangeset):
+            return NotImplemented
+        return self.difference(other)
+
+    def __eq__(self, other):
+        """Return self==value."""
+        if not isinstance(other, rangeset):
+            return NotImplemented
+        if self.starts == other.starts and self.stops == other.stops and self.steps == other.steps:
+            return True
+        # the same values can be split into progressions in several ways
+        length = len(self)
+        return length == len(other) == len(self.intersection(other))
+
+    def __hash__(self):
+        """Return hash(self)."""
+        if not self.starts:
+            return hash(())
+        return hash((len(self), self.starts[0], self.stops[-1]))
+
+    def __repr__(self):
+        """Return repr(self)."""
+        return "rangeset([%s])" % ", ".join([repr(interval) for interval in self.intervals()])
+
+    def tobytes(self):
+        """Return the progressions as bytes, in the machine's byte order."""
+        return self.starts.tobytes() + self.stops.tobytes() + self.steps.tobytes()
+
+    @classmethod
+    def frombytes(cls, data):
+        """Return a rangeset from bytes returned by tobytes()."""
+        self = object.__new__(cls)
+        self.__setstate__(data)
+        return self
+
+    def __reduce__(self):
+        """Return state information for pickling."""
+        return type(self), (), self.tobytes()
+
+    def __setstate__(self, state):
+        """Set state information for unpickling."""
+        bounds = _array.array("q")
+        bounds.frombytes(state)
+        if len(bounds) % 3:
+            raise ValueError("rangeset data must hold triples of bounds")
+        count = len(bounds) // 3
+        self.starts = bounds[:count]
+        self.stops = bounds[count:2 * count]
+        self.steps = bounds[2 * count:]
 
 class reversed:
     """reversed(sequence) -> reverse iterator over values of the sequence
@@ -2042,13 +3935,25 @@ class reversed:
     Return a reverse iterator
 
     Changes over built-in type:
-    None
+    + Binary and text files give their lines from the last one down to
+      the current position, read backwards through mmap without reading
+      the file into memory; text files split and translate lines as
+      their newline argument asks (files of the io module do not tell
+      it, and are taken to use the default), and must use an encoding
+      such as UTF-8 or latin-1 where "\n" is a single byte; pipes and
+      devices raise TypeError, as they cannot be mapped
+    + __checkpoint__ and __resume__ methods, used by checkpoint() and resume()
     """
 
+    __slots__ = {"iterable": "Sequence being iterated over.",
+                 "index": "Index of the next item to return."}
+
     def __new__(cls, iterable):
         """Create and return a new object. See help(type) for accurate signature."""
         if hasattr(type(iterable), "__reversed__"):
             return type(iterable).__reversed__(iterable)
+        if hasattr(iterable, "fileno") and hasattr(iterable, "readable"):
+            return _reversed_lines(iterable)
 
         instance = super().__new__(cls)
         instance.iterable = iterable
@@ -2070,17 +3975,21 @@ class reversed:
         """Private method returning an estimate of len(list(it))."""
         return self.index + 1
 
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        return self.index
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        self.index = state
+
     def __reduce__(self):
         """Return state information for pickling."""
         return type(self), (self.iterable,), self.index
 
-    @getset_descriptor
-    def iterable(self):
-        return []
-
-    @getset_descriptor
-    def index(self):
-        return 0
+    def __setstate__(self, state):
+        """Set state information for unpickling."""
+        self.index = state
 
 class slice:
     """slice(stop)
@@ -2092,10 +4001,14 @@ class slice:
     - Extended slicing (e.g. a[0:10:2]
     """
 
+    __slots__ = {"start": "Start index, or None.",
+                 "stop": "Stop index, or None.",
+                 "step": "Step, or None."}
+
     def __init__(self, stop, *args):
         """Initialize self. See help(type(self)) for accurate signature."""
         if args and len(args) > 2:
-            raise TypeError("slice expected at most 3 arguments, got %i" % len(args) + 1)
+            raise TypeError("slice expected at most 3 arguments, got %i" % (len(args) + 1))
         if args:
             self.start = stop
             self.stop = args[0]
@@ -2104,7 +4017,7 @@ class slice:
             else:
                 self.step = None
         else:
-            self.stop = start
+            self.stop = stop
             self.start = self.step = None
 
     def __eq__(self, value):
@@ -2159,26 +4072,116 @@ class slice:
         handling of normal slices.
         """
 
-        start = self.start or 0
-        stop = self.stop
-        step = self.step or 1
+        length = _slice_index(length)
+        if length < 0:
+            raise ValueError("length should not be negative")
 
-        if stop is None or stop > length:
-            stop = length
+        step = 1 if self.step is None else _slice_index(self.step)
+        if step == 0:
+            raise ValueError("slice step cannot be zero")
 
-        return start, stop, step
+        # the bounds a start or stop is clipped to
+        if step < 0:
+            lower, upper = -1, length - 1
+        else:
+            lower, upper = 0, length
 
-    @getset_descriptor
-    def start(self):
-        return 0
+        bounds = []
+        for index, default in ((self.start, upper if step < 0 else lower),
+                               (self.stop, lower if step < 0 else upper)):
+            if index is None:
+                index = default
+            else:
+                index = _slice_index(index)
+                if index < 0:
+                    index += length
+                    if index < lower:
+                        index = lower
+                elif index > upper:
+                    index = upper
+            bounds.append(index)
+
+        return bounds[0], bounds[1], step
+
+class seqview:
+    """seqview(sequence[, slice]) -> lazy view of sequence[slice]
+
+    Return a read-only view of the items of sequence (a list, tuple,
+    array.array, ...) selected by slice, which is slice(None) by default,
+    without copying them.  The view shares the sequence, so it sees changes
+    made to its items; its length is fixed when it is made.  Slicing a view
+    gives another view of the same sequence, with the two slices combined
+    into one, so views of views are as cheap as views.  Views support len(),
+    indexing, slicing, iteration and reversed(); tolist() copies the items.
 
-    @getset_descriptor
-    def stop(self):
-        return -1
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
 
-    @getset_descriptor
-    def step(self):
-        return 1
+    __slots__ = {"sequence": "Sequence being viewed.",
+                 "start": "Index in sequence of the first item.",
+                 "step": "Distance in sequence between two items.",
+                 "length": "Number of items."}
+
+    def __init__(self, sequence, slice=_builtin_slice(None)):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        if isinstance(sequence, seqview):
+            start, step, length = sequence.start, sequence.step, sequence.length
+            sequence = sequence.sequence
+        else:
+            start, step, length = 0, 1, len(sequence)
+
+        first, stop, stride = slice.indices(length)
+        self.sequence = sequence
+        self.start = start + first * step
+        self.step = step * stride
+        self.length = _range_length(first, stop, stride)
+
+    def __len__(self):
+        """Return len(self)."""
+        return self.length
+
+    def __getitem__(self, index):
+        """Return self[index]."""
+        if isinstance(index, (_builtin_slice, slice)):
+            return type(self)(self, index)
+
+        if not hasattr(index, "__index__"):
+            raise TypeError("seqview indices must be integers or slices, not %s" % type(index).__name__)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("seqview index out of range")
+        return self.sequence[self.start + index * self.step]
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        sequence, step = self.sequence, self.step
+        index = self.start
+        end = index + self.length * step
+        while index != end:
+            yield sequence[index]
+            index += step
+
+    def __reversed__(self):
+        """Return a reverse iterator over the view."""
+        sequence, step = self.sequence, self.step
+        end = self.start - step
+        index = end + self.length * step
+        while index != end:
+            yield sequence[index]
+            index -= step
+
+    def tolist(self):
+        """Return the items of the view in a new list."""
+        if not self.length:
+            return []
+        stop = self.start + self.length * self.step
+        return list(self.sequence[self.start:stop if stop >= 0 else None:self.step])
+
+    def __repr__(self):
+        """Return repr(self)."""
+        return "<seqview of %i items of a %s>" % (self.length, type(self.sequence).__name__)
 
 class super:
     """super() -> same as super(__class__, <first argument>)
@@ -2199,115 +4202,128 @@ class super:
     None
     """
 
+    __slots__ = {"__thisclass__": "the class invoking super()",
+                 "__self__": "the instance invoking super(); may be None",
+                 "__self_class__": "the type of the instance invoking super(); may be None",
+                 "_state": "(instance, type, classes after __thisclass__ in the MRO) tuple used by attribute lookup"}
+
     def __init__(self, *args):
         """Initialize self. See help(type(self)) for accurate signature."""
-        if len(args) > 2:
-            raise TypeError("super() takes at most 2 positional arguments (%i given)" % len(args))
-
+        # this runs for every super() call, so the module's own len(),
+        # getattr() and isinstance() are kept out of it
         if not args:
+            # the compiler creates a __class__ cell in every method using super,
+            # so only the caller's own frame is needed
             frame = _sys._getframe(1)
-            if frame.f_back is None or frame.f_back.f_code.co_name == "<module>":
+            co = frame.f_code
+            if not co.co_argcount:
                 raise RuntimeError("super(): no arguments")
-            obj = frame.f_locals[frame.f_code.co_varnames[0]]
-            args = (type(obj), obj)
-
-        if args[0] is None:
-            raise TypeError("must be type, not None")
-
-        if len(args) == 1 and isinstance(args[0], type):
-            self.__self__ = None
-            self.__self_class__ = None
-            self.__thisclass__ = args[0]
-
-        elif isinstance(args[1], args[0]):
-            self.__self__ = args[1]
-            self.__self_class__ = args[0]
-            self.__thisclass__ = args[0]
-
-        elif isinstance(args[0], type) and issubclass(args[1], args[0]):
-            self.__self__ = args[1]
-            self.__self_class__ = args[1]
-            self.__thisclass__ = args[0]
+            if "__class__" not in co.co_freevars:
+                raise RuntimeError("super(): __class__ cell not found")
+            f_locals = frame.f_locals # the only way to the cell and the first argument
+            if "__class__" not in f_locals:
+                raise RuntimeError("super(): empty __class__ cell")
+            args = (f_locals["__class__"], f_locals[co.co_varnames[0]])
+        elif args[2:]:
+            raise TypeError("super() takes at most 2 positional arguments (%i given)" % args.__len__())
+
+        thisclass = args[0]
+        if type not in type(thisclass).__mro__:
+            raise TypeError("must be type, not %s" % type(thisclass).__name__)
+
+        obj = starttype = mro = None
+        start = 0
+        if args[1:]:
+            obj = args[1]
+            kind = type(obj)
+            if type in kind.__mro__ and thisclass in obj.__mro__:
+                starttype = obj
+            elif thisclass in kind.__mro__:
+                starttype = kind
+            else:
+                raise TypeError("super(type, obj): obj must be an instance or subtype of type")
+            mro = starttype.__mro__
+            # the lookup starts after thisclass in the MRO; find it only once
+            start = mro.index(thisclass) + 1
 
-        else:
-            raise TypeError("must be type, not %s" % args[0].__name__)
+        self.__thisclass__ = thisclass
+        self.__self__ = obj
+        self.__self_class__ = starttype
+        self._state = (None if obj is starttype else obj, starttype, mro[start:] if mro else None)
 
     def __getattribute__(self, name):
         """Return getattr(self, name)."""
-        def getter(func):
-            def inner(*args, **kwargs):
-                return func(__self__, *args, **kwargs)
-
-            inner.__name__ = func.__name__
-            inner.__doc__ = func.__doc__
-
-            if _sys.version_info >= (3, 3):
-                inner.__qualname__ = func.__qualname__
-
-            return inner
+        instance, starttype, classes = object.__getattribute__(self, "_state")
 
-        __self__ = object.__getattribute__(self, "__self__")
-        __self_class__ = object.__getattribute__(self, "__self_class__")
-        __thisclass__ = object.__getattribute__(self, "__thisclass__")
-
-        if __self__ is __self_class__ is None:
+        if starttype is None or name == "__class__":
             return object.__getattribute__(self, name)
 
-        __mro__ = __thisclass__.__mro__
-        class_index = __mro__.index(__thisclass__) + 1
-        while class_index < len(__mro__):
-            next_class = __mro__[class_index]
-            if name in next_class.__dict__:
-                if __self_class__ is __thisclass__:
-                    return getter(next_class.__dict__[name])
-                elif __self__ is __self_class__:
-                    return next_class.__dict__[name]
-            class_index += 1
+        for cls in classes:
+            namespace = cls.__dict__
+            if name in namespace:
+                attr = namespace[name]
+                try:
+                    get = type(attr).__get__
+                except AttributeError:
+                    return attr
+                return get(attr, instance, starttype)
 
-        raise AttributeError(name)
+        return object.__getattribute__(self, name)
 
     def __repr__(self):
         """Return repr(self)."""
-        __self__ = object.__getattribute__(self, "__self__")
-        __self_class__ = object.__getattribute__(self, "__self_class__")
-        __thisclass__ = object.__getattribute__(self, "__thisclass__")
-
-        if __self__ is __self_class__ is None:
-            return "<super: <class %r>, NULL>" % __thisclass__.__name__
-        if __self_class__ is __thisclass__:
-            return "<super: <class %r>, <%s object>>" % ((__thisclass__.__name__,) * 2)
-        if __self__ is __self_class__:
-            return "<super: <class %r>, <%s object>>" % (__thisclass__.__name__, __self__.__name__)
-
-    @member_descriptor
-    def __self__(self):
-        return self
-
-    @member_descriptor
-    def __self_class__(self):
-        return self.__class__
+        starttype = object.__getattribute__(self, "__self_class__")
+        thisclass = object.__getattribute__(self, "__thisclass__")
 
-    @member_descriptor
-    def __thisclass__(self):
-        return self.__class__
+        if starttype is None:
+            return "<super: <class %r>, NULL>" % thisclass.__name__
+        return "<super: <class %r>, <%s object>>" % (thisclass.__name__, starttype.__name__)
 
 class zip:
-    """zip(iter1 [,iter2 [...]]) --> zip object
+    """zip(iter1 [,iter2 [...]], strict=False) --> zip object
+    zip(iter1 [,iter2 [...]], longest=True[, fillvalue=None]) --> zip object
 
     Return a zip object whose .__next__() method returns a tuple where
     the i-th element comes from the i-th iterable argument.  The .__next__()
     method continues until the shortest iterable in the argument sequence
     is exhausted and then it raises StopIteration.
 
+    If strict is true, a ValueError is raised if the iterables do not all
+    have the same length.  If longest is true, it continues until the
+    longest iterable is exhausted instead, using fillvalue in place of the
+    missing values.
+
     Changes over built-in type:
-    None
+    + __next_chunk__ method, to get a list of several tuples at once
+    + __length_hint__ method, when all the iterables give a length or a hint
+    + __checkpoint__ and __resume__ methods, used by checkpoint() and resume()
+    + Support for the 'longest' and 'fillvalue' keyword arguments, as in
+      itertools.zip_longest
     """
 
-    def __init__(self, *iterables):
+    __slots__ = {"iterators": "Iterators over the wrapped iterables.",
+                 "_nexts": "Bound __next__ methods of the iterators.",
+                 "_args": "Item list reused by every step, None while in use.",
+                 "_strict": "Whether unequal lengths are an error.",
+                 "_longest": "Whether to stop at the longest iterable.",
+                 "_fillvalue": "Value used for exhausted iterables in longest mode.",
+                 "_active": "Number of iterators not exhausted yet."}
+
+    def __init__(self, *iterables, strict=False, longest=False, fillvalue=None):
         """Initialize self. See help(type(self)) for accurate signature."""
+        if strict and longest:
+            raise ValueError("zip() cannot be both strict and longest")
         self.iterators = tuple(iter(iterable) for iterable in iterables)
-        self.length = len(min(iterables))
-        self.index = 0
+        self._strict = strict
+        self._longest = longest
+        self._fillvalue = fillvalue
+        if self.iterators:
+            self._nexts = [iterator.__next__ for iterator in self.iterators]
+            self._active = len(self._nexts)
+        else: # stand-in iterator, so that __next__ needs no special case
+            self._nexts = [iter(()).__next__]
+            self._active = 1
+        self._args = [None] * len(self._nexts)
 
     def __iter__(self):
         """Implement iter(self)."""
@@ -2315,28 +4331,1646 @@ class zip:
 
     def __next__(self):
         """Implement next(self)."""
-        if self.length > self.index + 1:
-            args = []
-            for iterator in self.iterators:
-                args.append(next(iterator))
+        args = _take_args(self)
+        index = 0
+        try:
+            for next_item in self._nexts:
+                args[index] = next_item()
+                index += 1
+        except StopIteration:
+            return self._exhausted(args, index)
+
+        self._args = args
+        return tuple(args)
+
+    def _exhausted(self, args, index):
+        """Handle the iterator at index running out during a step."""
+        if self._strict:
+            _zip_check_strict(self.iterators, index)
+
+        if not self._longest:
+            raise StopIteration # the list is dropped, so the items are released
+
+        nexts = self._nexts
+        fillvalue = self._fillvalue
+        while True:
+            self._active -= 1
+            if self._active <= 0:
+                # stay exhausted, as itertools.zip_longest does
+                self._active = 0
+                nexts[:] = [_zip_stop] * len(nexts)
+                raise StopIteration
+            nexts[index] = lambda: fillvalue
+            args[index] = fillvalue
+            index += 1
+            try:
+                while index < len(nexts):
+                    args[index] = nexts[index]()
+                    index += 1
+            except StopIteration:
+                continue
+            break
+
+        self._args = args
+        return tuple(args)
 
-            self.index += 1
-            return tuple(args)
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        if not (self._strict or self._longest):
+            return _next_chunk_rows(self.iterators, size)
 
-        raise StopIteration
+        chunk = []
+        try:
+            while len(chunk) < size:
+                chunk.append(self.__next__())
+        except StopIteration:
+            pass
+        return chunk
+
+    def __length_hint__(self):
+        """Private method returning an estimate of len(list(it))."""
+        result = None
+        for iterator in self.iterators:
+            hint = _length_hint(iterator)
+            if hint is None:
+                return NotImplemented
+            if result is None or (hint > result if self._longest else hint < result):
+                result = hint
+        return result or 0
+
+    def __instrument__(self):
+        """Wrap the inputs of self for instrument(); return (inputs, timer)."""
+        probes = tuple([_instrument(iterator) for iterator in self.iterators])
+        index = 0
+        for iterator in self.iterators:
+            if self._nexts[index] == iterator.__next__: # not replaced by the fill value
+                self._nexts[index] = probes[index].__next__
+            index += 1
+        self.iterators = probes
+        return probes, None
+
+    def _exhausted_indexes(self):
+        """Return the indexes of the iterators replaced by the fill value in
+        longest mode."""
+        exhausted = []
+        index = 0
+        for iterator in self.iterators:
+            if self._nexts[index] != iterator.__next__:
+                exhausted.append(index)
+            index += 1
+        return tuple(exhausted)
+
+    def _set_exhausted(self, exhausted):
+        """Replace the iterators at the indexes in exhausted by the fill value."""
+        fillvalue = self._fillvalue
+        for index in exhausted:
+            self._nexts[index] = lambda: fillvalue
+        self._active = len(self._nexts) - len(exhausted)
+        if not self._active:
+            self._nexts[:] = [_zip_stop] * len(self._nexts)
+
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        return tuple([_checkpoint(iterator) for iterator in self.iterators]), self._exhausted_indexes()
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        positions, exhausted = state
+        if len(positions) != len(self.iterators):
+            raise ValueError("checkpoint of a zip object over %i iterables" % len(positions))
+        index = 0
+        for iterator, position in zip(self.iterators, positions):
+            _resume(iterator, position)
+            self._nexts[index] = iterator.__next__
+            index += 1
+        self._set_exhausted(exhausted)
 
     def __reduce__(self):
         """Return state information for pickling."""
-        return type(self), self.iterators
+        return type(self), self.iterators, (self._strict, self._longest, self._fillvalue,
+                                            self._exhausted_indexes())
+
+    def __setstate__(self, state):
+        """Set state information for unpickling."""
+        self._strict, self._longest, self._fillvalue = state[:3]
+        if len(state) > 3: # older pickles do not record the exhausted inputs
+            self._set_exhausted(state[3])
+
+def unzip(rows, typecodes=None):
+    """unzip(rows[, typecodes]) -> tuple or dict of columns
+
+    Transpose an iterable of rows into columns; the inverse of zip(*columns).
+    Rows are tuples (or other sequences), giving a tuple of columns, or dicts,
+    giving a dict of columns with the same keys.
+
+    Numeric columns are stored in array.array buffers instead of lists of
+    boxed objects.  typecodes gives the typecode of each column (a sequence,
+    or a mapping for dict rows), with None meaning a plain list.  Columns
+    without a typecode are inferred from the first row: 'q' for ints, 'd' for
+    floats and a list for anything else; an inferred array column which gets
+    a value of another type (a bool, or an int in a float column) or one too
+    large for it is turned into a list.  rowview() turns the
+    columns back into rows without copying them.
 
-    @getset_descriptor
-    def iterators(self):
-        return []
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
 
-    @getset_descriptor
-    def length(self):
-        return 0
+    iterator = iter(rows)
+    chunk = _next_chunk(iterator, 4096)
+    if not chunk:
+        return {} if isinstance(typecodes, dict) else ()
+
+    first = chunk[0]
+    keys = tuple(first) if isinstance(first, dict) else None
+    columns, inferred = [], [] # inferred: the exact type of the values of inferred array columns
+    for index, value in enumerate(first.values() if keys is not None else first):
+        if typecodes is None:
+            typecode = _missing
+        elif keys is not None:
+            typecode = typecodes.get(keys[index], _missing)
+        else:
+            typecode = typecodes[index] if index < len(typecodes) else _missing
+
+        kind = None
+        if typecode is _missing:
+            typecode = {int: "q", float: "d"}.get(type(value))
+            if typecode is not None:
+                kind = type(value)
+        inferred.append(kind)
+        columns.append([] if typecode is None else _array.array(typecode))
+
+    while chunk:
+        for index, column in enumerate(columns):
+            key = index if keys is None else keys[index]
+            values = [row[key] for row in chunk]
+            kind = inferred[index]
+            if kind is not None and set(_builtin_map(type, values)) != {kind}:
+                # array('d') silently takes ints and array('q') bools, so
+                # anything but exactly the inferred type makes a list
+                columns[index] = column.tolist() + values
+                inferred[index] = None
+                continue
+            size = len(column)
+            try:
+                column.extend(values)
+            except OverflowError:
+                if kind is None:
+                    raise
+                # the array may hold part of the values already
+                columns[index] = column[:size].tolist() + values
+                inferred[index] = None
+        chunk = _next_chunk(iterator, 4096)
+
+    if keys is not None:
+        return dict(zip(keys, columns))
+    return tuple(columns)
+
+class rowview:
+    """rowview(columns) -> lazy sequence of rows
+
+    Give a read-only sequence of the rows of columns, which is a sequence of
+    columns or a mapping of names to columns, as returned by unzip().  Rows
+    are only built when accessed: tuples for a sequence of columns, dicts for
+    a mapping.  The columns are not copied, except when slicing the view.
 
-    @getset_descriptor
-    def index(self):
-        return 0
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"columns": "Tuple of the columns.",
+                 "keys": "Names of the columns, or None for tuple rows."}
+
+    def __init__(self, columns):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        if isinstance(columns, dict):
+            self.keys = tuple(columns)
+            self.columns = tuple(columns.values())
+        else:
+            self.keys = None
+            self.columns = tuple(columns)
+
+    def __len__(self):
+        """Return len(self)."""
+        if not self.columns:
+            return 0
+        length = len(self.columns[0])
+        for column in self.columns:
+            if len(column) < length:
+                length = len(column)
+        return length
+
+    def __getitem__(self, index):
+        """Return self[index]."""
+        if isinstance(index, (_builtin_slice, slice)):
+            columns = [column[index] for column in self.columns]
+            return type(self)(columns if self.keys is None else dict(zip(self.keys, columns)))
+
+        if not hasattr(index, "__index__"):
+            raise TypeError("rowview indices must be integers or slices, not %s" % type(index).__name__)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("rowview index out of range")
+
+        values = tuple([column[index] for column in self.columns])
+        if self.keys is None:
+            return values
+        return dict(zip(self.keys, values))
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        if self.keys is None:
+            yield from zip(*self.columns)
+        else:
+            for values in zip(*self.columns):
+                yield dict(zip(self.keys, values))
+
+    def __repr__(self):
+        """Return repr(self)."""
+        return "<rowview of %i rows>" % len(self)
+
+class batched:
+    """batched(iterable, n, *, reuse=False) --> batched object
+
+    Return an iterator yielding the items of iterable in batches of n, as
+    tuples; the last batch may be shorter.
+    If iterable supports the buffer protocol (bytes, bytearray, array.array,
+    mmap, ...), batches are memoryview slices of it and nothing is copied.
+    With reuse=True, the same list is refilled and yielded for every batch,
+    for consumers which are done with each batch before asking for the next.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"iterator": "Iterator over the wrapped iterable, or None for a buffer.",
+                 "n": "Number of items per batch.",
+                 "_view": "Memoryview of a buffer, or None.",
+                 "_index": "Position of the next batch in the buffer.",
+                 "_reuse": "List yielded for every batch, or None."}
+
+    def __init__(self, iterable, n, *, reuse=False):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        if n < 1:
+            raise ValueError("n must be at least one")
+        self.n = n
+        self._index = 0
+        self._reuse = [] if reuse else None
+        self._view = _buffer_view(iterable)
+        self.iterator = None if self._view is not None else iter(iterable)
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        view = self._view
+        if view is not None:
+            start = self._index
+            if start >= len(view):
+                raise StopIteration
+            self._index = start + self.n
+            return view[start:start + self.n]
+
+        window = self._reuse
+        if window is None:
+            chunk = _next_chunk(self.iterator, self.n)
+            if not chunk:
+                raise StopIteration
+            return tuple(chunk)
+
+        window.clear()
+        append = window.append
+        next_item = self.iterator.__next__
+        try:
+            while len(window) < self.n:
+                append(next_item())
+        except StopIteration:
+            if not window:
+                raise
+        return window
+
+    def __length_hint__(self):
+        """Private method returning an estimate of len(list(it))."""
+        if self._view is not None:
+            hint = len(self._view) - self._index
+        else:
+            hint = _length_hint(self.iterator)
+            if hint is None:
+                return NotImplemented
+        if hint <= 0: # the last batch of a buffer may go past its end
+            return 0
+        return -(-hint // self.n)
+
+    def __instrument__(self):
+        """Wrap the input of self for instrument(); return (inputs, timer)."""
+        if self._view is not None:
+            return (), None
+        self.iterator = _instrument(self.iterator)
+        return (self.iterator,), None
+
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        if self._view is not None:
+            return self._index
+        return _checkpoint(self.iterator)
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        if self._view is not None:
+            self._index = state
+        else:
+            _resume(self.iterator, state)
+
+class windowed:
+    """windowed(iterable, n, step=1, *, reuse=False) --> windowed object
+
+    Return an iterator yielding overlapping windows of n consecutive items of
+    iterable as tuples, each window starting step items after the previous
+    one.  Only full windows are yielded.
+    Items are kept in a deque of n items, so each item is read only once.
+    If iterable supports the buffer protocol (bytes, bytearray, array.array,
+    mmap, ...), windows are memoryview slices of it and nothing is copied.
+    With reuse=True, the deque itself is yielded for every window, for
+    consumers which are done with each window before asking for the next.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"iterator": "Iterator over the wrapped iterable, or None for a buffer.",
+                 "n": "Number of items per window.",
+                 "step": "Distance between the starts of two windows.",
+                 "_window": "Deque of the items of the last window, or None before the first one.",
+                 "_view": "Memoryview of a buffer, or None.",
+                 "_index": "Position of the next window in the buffer.",
+                 "_reuse": "Whether to yield the deque instead of tuples."}
+
+    def __init__(self, iterable, n, step=1, *, reuse=False):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        if n < 1:
+            raise ValueError("n must be at least one")
+        if step < 1:
+            raise ValueError("step must be at least one")
+        self.n = n
+        self.step = step
+        self._window = None
+        self._index = 0
+        self._reuse = reuse
+        self._view = _buffer_view(iterable)
+        self.iterator = None if self._view is not None else iter(iterable)
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        n = self.n
+        view = self._view
+        if view is not None:
+            start = self._index
+            if start + n > len(view):
+                raise StopIteration
+            self._index = start + self.step
+            return view[start:start + n]
+
+        window = self._window
+        if window is None:
+            from collections import deque
+            items = _next_chunk(self.iterator, n)
+            if len(items) < n:
+                raise StopIteration
+            window = self._window = deque(items, n)
+        else:
+            skip = self.step - n
+            if skip > 0 and len(_next_chunk(self.iterator, skip)) < skip:
+                raise StopIteration
+            count = self.step if skip < 0 else n
+            items = _next_chunk(self.iterator, count)
+            if len(items) < count:
+                raise StopIteration
+            window.extend(items) # the deque drops the items going out of the window
+
+        if self._reuse:
+            return window
+        return tuple(window)
+
+    def __length_hint__(self):
+        """Private method returning an estimate of len(list(it))."""
+        if self._view is not None:
+            hint = len(self._view) - self._index
+        else:
+            hint = _length_hint(self.iterator)
+            if hint is None:
+                return NotImplemented
+            if self._window is not None: # every further window reads step items
+                return hint // self.step
+        if hint < self.n:
+            return 0
+        return (hint - self.n) // self.step + 1
+
+    def __instrument__(self):
+        """Wrap the input of self for instrument(); return (inputs, timer)."""
+        if self._view is not None:
+            return (), None
+        self.iterator = _instrument(self.iterator)
+        return (self.iterator,), None
+
+    def __checkpoint__(self):
+        """Return the position of self, as used by checkpoint()."""
+        if self._view is not None:
+            return self._index
+        window = None if self._window is None else tuple(self._window)
+        return window, _checkpoint(self.iterator)
+
+    def __resume__(self, state):
+        """Move self to a position from __checkpoint__(), as used by resume()."""
+        if self._view is not None:
+            self._index = state
+            return
+        window, state = state
+        if window is not None:
+            from collections import deque
+            self._window = deque(window, self.n)
+        _resume(self.iterator, state)
+
+class shared:
+    """shared(iterable, batch=1) --> shared object
+
+    Return an iterator over iterable which several threads can advance at
+    once.  iterable is only read with a lock held, so two threads never step
+    its iterator together; the iterators of this module, and generators, are
+    not safe to share otherwise, least of all on free-threaded builds.
+    Each thread takes batch items at a time, then returns them without
+    taking the lock again: the threads do not get the items in their
+    original order, and a thread which stops iterating drops what is left of
+    its batch.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"iterator": "Iterator over the wrapped iterable.",
+                 "batch": "Number of items taken at a time by each thread.",
+                 "_lock": "Lock held while reading from the iterator.",
+                 "_local": "Thread-local data, holding the items left from a batch, last item first.",
+                 "_exhausted": "Whether the iterator is exhausted."}
+
+    def __init__(self, iterable, batch=1):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        if batch < 1:
+            raise ValueError("batch must be at least one")
+        self.iterator = iter(iterable)
+        self.batch = batch
+        self._lock = _thread.allocate_lock()
+        self._local = _thread._local()
+        self._exhausted = False
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        local = self._local
+        try:
+            items = local.items
+        except AttributeError:
+            items = local.items = []
+        if items:
+            return items.pop()
+
+        with self._lock:
+            if self._exhausted:
+                raise StopIteration
+            if self.batch == 1:
+                return self.iterator.__next__()
+            chunk = _next_chunk(self.iterator, self.batch)
+            if not chunk:
+                self._exhausted = True
+                raise StopIteration
+
+        chunk.reverse()
+        item = chunk.pop()
+        local.items = chunk
+        return item
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        local = self._local
+        chunk = []
+        items = getattr(local, "items", None)
+        while items and len(chunk) < size:
+            chunk.append(items.pop())
+
+        with self._lock:
+            if len(chunk) < size and not self._exhausted:
+                values = _next_chunk(self.iterator, size - len(chunk))
+                if not values:
+                    self._exhausted = True
+                chunk.extend(values)
+        return chunk
+
+class _teebuffer:
+    """Ring buffer of the items read from an iterator, for the tee() iterators."""
+
+    __slots__ = ("iterator", "ring", "left", "head", "tail", "readers",
+                 "maxsize", "condition", "exhausted")
+
+    def __init__(self, iterable, readers, maxsize):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        import threading
+
+        self.iterator = iter(iterable)
+        # item read at position p is in ring[p % len(ring)], and left[p % len(ring)]
+        # is the number of iterators which have yet to return it
+        self.ring = [None] * 16
+        self.left = [0] * 16
+        self.head = 0 # position of the next item to read from the iterator
+        self.tail = 0 # position of the oldest item still kept
+        self.readers = readers
+        self.maxsize = maxsize
+        # reentrant, as dropping an item may close another tee() iterator
+        self.condition = threading.Condition(_thread.RLock())
+        self.exhausted = False
+
+    def read(self, position):
+        """Return the item at position, reading it from the iterator if needed."""
+        with self.condition:
+            while position == self.head:
+                if self.exhausted:
+                    raise StopIteration
+                if self.maxsize is not None and self.head - self.tail >= self.maxsize:
+                    self.condition.wait() # until the slowest iterator catches up
+                    continue
+                self._append()
+
+            index = position & (len(self.ring) - 1)
+            item = self.ring[index]
+            self.left[index] -= 1
+            if not self.left[index]:
+                # every iterator has returned all the items up to this one
+                self.ring[index] = None
+                self.tail = position + 1
+                if self.maxsize is not None:
+                    self.condition.notify_all()
+            return item
+
+    def leave(self, position):
+        """Forget an iterator which stopped at position."""
+        with self.condition:
+            self.readers -= 1
+            mask = len(self.ring) - 1
+            while position < self.head:
+                index = position & mask
+                self.left[index] -= 1
+                if not self.left[index]:
+                    self.ring[index] = None
+                position += 1
+            while self.tail < self.head and not self.left[self.tail & mask]:
+                self.tail += 1
+            self.condition.notify_all()
+
+    def _append(self):
+        """Read one more item from the iterator, growing the ring if it is full."""
+        size = len(self.ring)
+        if self.head - self.tail == size:
+            ring = [None] * (2 * size)
+            left = [0] * (2 * size)
+            position = self.tail
+            while position < self.head:
+                ring[position & (2 * size - 1)] = self.ring[position & (size - 1)]
+                left[position & (2 * size - 1)] = self.left[position & (size - 1)]
+                position += 1
+            self.ring, self.left = ring, left
+
+        try:
+            item = self.iterator.__next__()
+        except StopIteration:
+            self.exhausted = True
+            raise
+
+        index = self.head & (len(self.ring) - 1)
+        self.ring[index] = item
+        self.left[index] = self.readers
+        self.head += 1
+
+class _tee:
+    """One of the iterators returned by tee()."""
+
+    __slots__ = ("_buffer", "_position")
+
+    def __init__(self, buffer):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self._buffer = buffer
+        self._position = 0
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        buffer = self._buffer
+        if buffer is None:
+            raise StopIteration
+        item = buffer.read(self._position)
+        self._position += 1
+        return item
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Stop iterating, so that no more items are kept for this iterator."""
+        buffer = getattr(self, "_buffer", None)
+        if buffer is not None:
+            self._buffer = None
+            buffer.leave(self._position)
+
+def tee(iterable, n=2, *, maxsize=None):
+    """tee(iterable, n=2, *, maxsize=None) -> tuple of n iterators
+
+    Return n independent iterators over the items of iterable, which is read
+    only once.  The items are kept in a ring buffer shared by the iterators,
+    until every iterator has returned them: memory grows with the distance
+    between the fastest and the slowest iterator, and closing an iterator
+    (or dropping it) stops keeping items for it.
+    The iterators may be advanced from different threads, each iterator
+    being used by one thread.  With maxsize, an iterator which is maxsize
+    items ahead of the slowest one waits for it to catch up; this bounds the
+    memory, but would wait forever if both are advanced by the same thread.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    if maxsize is not None and maxsize < 1:
+        raise ValueError("maxsize must be at least one")
+
+    buffer = _teebuffer(iterable, n, maxsize)
+    iterators = []
+    while len(iterators) < n:
+        iterators.append(_tee(buffer))
+    return tuple(iterators)
+
+class checkpointed:
+    """checkpointed(iterator, path, every=1000, interval=None) --> checkpointed object
+
+    Return an iterator over the items of iterator which saves the position
+    given by checkpoint() to the file at path, every 'every' items or every
+    'interval' seconds, whichever comes first.  If that file exists, iterator
+    is first resumed from it, so that a job started again after stopping goes
+    on from its last checkpoint instead of from the start; iterator must be
+    built the same way each time, over the same sources.
+    A checkpoint is taken when the next item is asked for, so it comes after
+    every item already returned; items returned after the last checkpoint
+    are returned again when resuming.  The file is replaced atomically, and
+    removed once iterator is exhausted.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"iterator": "Pipeline being saved.",
+                 "path": "File holding the last checkpoint.",
+                 "every": "Number of items between two checkpoints.",
+                 "interval": "Number of seconds between two checkpoints, or None.",
+                 "_count": "Number of items returned since the last checkpoint.",
+                 "_deadline": "Time of the next checkpoint, or None."}
+
+    def __init__(self, iterator, path, every=1000, interval=None):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        import pickle
+
+        if every < 1:
+            raise ValueError("every must be at least one")
+        self.iterator = iter(iterator)
+        self.path = _os.fspath(path)
+        self.every = every
+        self.interval = interval
+        self._count = 0
+        self._deadline = None if interval is None else _time.monotonic() + interval
+
+        try:
+            with open(self.path, "rb") as file:
+                state = pickle.load(file)
+        except FileNotFoundError:
+            pass
+        else:
+            _resume(self.iterator, state)
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        if self._count >= self.every or (self._deadline is not None and
+                                         _time.monotonic() >= self._deadline):
+            self.save()
+
+        try:
+            item = self.iterator.__next__()
+        except StopIteration:
+            try:
+                _os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        self._count += 1
+        return item
+
+    def save(self):
+        """Write the current position to the file now."""
+        import pickle
+
+        data = pickle.dumps(_checkpoint(self.iterator), pickle.HIGHEST_PROTOCOL)
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as file:
+            file.write(data)
+            file.flush()
+            _os.fsync(file.fileno())
+        _os.replace(temp, self.path) # never leaves a partly written checkpoint
+
+        self._count = 0
+        if self.interval is not None:
+            self._deadline = _time.monotonic() + self.interval
+
+class _prefetchbuffer:
+    """Queue of the items read ahead by the thread of a prefetch object."""
+
+    __slots__ = ("iterator", "size", "nbytes", "queue", "used", "condition",
+                 "closed", "done", "error", "items", "stalls", "stall_time",
+                 "full_time", "occupancy", "max_occupancy")
+
+    def __init__(self, iterable, size, nbytes):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        import collections
+        import threading
+
+        self.iterator = iter(iterable)
+        self.size = size
+        self.nbytes = nbytes
+        self.queue = collections.deque() # (item, size in bytes) pairs
+        self.used = 0 # bytes in the queue
+        self.condition = threading.Condition(_thread.allocate_lock())
+        self.closed = False
+        self.done = False
+        self.error = None
+        self.items = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.full_time = 0.0
+        self.occupancy = 0 # sum of the queue lengths seen by get()
+        self.max_occupancy = 0
+
+    def _full(self):
+        """Whether the thread must wait before reading another item."""
+        queue = self.queue
+        if len(queue) >= self.size:
+            return True
+        return self.nbytes is not None and queue and self.used >= self.nbytes
+
+    def run(self):
+        """Read items until exhausted or closed, in the background thread."""
+        condition = self.condition
+        next_item = self.iterator.__next__
+        try:
+            while True:
+                with condition:
+                    if self._full():
+                        start = _time.perf_counter()
+                        while not self.closed and self._full():
+                            condition.wait()
+                        self.full_time += _time.perf_counter() - start
+                    if self.closed:
+                        return
+
+                try:
+                    item = next_item()
+                except StopIteration:
+                    error = None
+                except BaseException as exc: # given to the consumer after the items before it
+                    error = exc
+                else:
+                    weight = 0 if self.nbytes is None else _item_size(item)
+                    with condition:
+                        self.queue.append((item, weight))
+                        self.used += weight
+                        if len(self.queue) > self.max_occupancy:
+                            self.max_occupancy = len(self.queue)
+                        condition.notify_all()
+                    continue
+
+                with condition:
+                    self.error = error
+                    self.done = True
+                    condition.notify_all()
+                return
+        finally:
+            self.iterator = next_item = None
+
+    def get(self):
+        """Return the next item, waiting for the thread if there is none yet."""
+        condition = self.condition
+        with condition:
+            queue = self.queue
+            if not queue and not self.done:
+                start = _time.perf_counter()
+                self.stalls += 1
+                while not queue and not self.done:
+                    condition.wait()
+                self.stall_time += _time.perf_counter() - start
+
+            self.occupancy += len(queue)
+            if queue:
+                item, weight = queue.popleft()
+                self.used -= weight
+                self.items += 1
+                condition.notify_all()
+                return item
+
+            error = self.error
+            if error is not None:
+                self.error = None
+                raise error
+            raise StopIteration
+
+    def close(self):
+        """Stop the thread and drop the items read ahead."""
+        with self.condition:
+            self.closed = self.done = True
+            self.queue.clear()
+            self.used = 0
+            self.condition.notify_all()
+
+class prefetch:
+    """prefetch(iterable, size=32, nbytes=None) --> prefetch object
+
+    Return an iterator over the items of iterable, which are read ahead by a
+    background thread, so that a slow source (a network filesystem, a
+    compressed file, ...) is read while the items before are processed.
+    At most size items are read ahead, and at most nbytes bytes if given
+    (buffers are counted by their size, other objects by sys.getsizeof());
+    an exception raised by iterable is raised by next() after the items
+    before it.  Call close() (or use the object as a context manager) to
+    stop the thread when not consuming everything; this is also done when
+    the object is garbage collected.  The thread stops after the item it is
+    reading, as it cannot interrupt iterable.
+    iterable must not reuse the objects it returns, as with the buffers of
+    iter(readinto, b"", buffersize=n).  stats() gives the time spent waiting
+    for the thread and how full the read-ahead queue is.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"_buffer": "Queue shared with the thread, or None once closed."}
+
+    def __init__(self, iterable, size=32, nbytes=None):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        import threading
+
+        if size < 1:
+            raise ValueError("size must be at least one")
+        if nbytes is not None and nbytes < 1:
+            raise ValueError("nbytes must be at least one")
+        # the thread only holds the buffer, so that self can be collected
+        self._buffer = _prefetchbuffer(iterable, size, nbytes)
+        threading.Thread(target=self._buffer.run, name="prefetch", daemon=True).start()
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        buffer = self._buffer
+        if buffer is None:
+            raise StopIteration
+        return buffer.get()
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        chunk = []
+        try:
+            while len(chunk) < size:
+                chunk.append(self.__next__())
+                if not self._buffer.queue: # do not wait for more
+                    break
+        except StopIteration:
+            pass
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Stop the thread, dropping any item read ahead."""
+        buffer = getattr(self, "_buffer", None)
+        if buffer is not None:
+            self._buffer = None
+            buffer.close()
+
+    def stats(self):
+        """Return a dict of read-ahead metrics.
+
+        items is the number of items returned, stalls the number of times
+        next() had to wait for the thread and stall_time the seconds spent
+        waiting; full_time is the seconds the thread waited for room.
+        occupancy is the number of items read ahead now, mean_occupancy and
+        max_occupancy the mean seen by next() and the maximum so far, and
+        bytes is the size of the items read ahead, if nbytes is given.
+        """
+        buffer = self._buffer
+        if buffer is None:
+            raise ValueError("stats() of a closed prefetch object")
+        with buffer.condition:
+            gets = buffer.items + buffer.done
+            return {"items": buffer.items,
+                    "stalls": buffer.stalls,
+                    "stall_time": buffer.stall_time,
+                    "full_time": buffer.full_time,
+                    "occupancy": len(buffer.queue),
+                    "mean_occupancy": buffer.occupancy / gets if gets else 0.0,
+                    "max_occupancy": buffer.max_occupancy,
+                    "bytes": buffer.used}
+
+class _timer:
+    """Function of an instrumented stage, counting and timing its calls."""
+
+    __slots__ = ("function", "calls", "time")
+
+    def __init__(self, function):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.function = function
+        self.calls = 0
+        self.time = 0.0
+
+    def __call__(self, *args):
+        """Call self as a function."""
+        start = _time.perf_counter()
+        try:
+            return self.function(*args)
+        finally:
+            self.time += _time.perf_counter() - start
+            self.calls += 1
+
+class _probe:
+    """Stage of an instrumented pipeline, counting and timing its items."""
+
+    __slots__ = ("iterator", "inputs", "timer", "items", "time", "_next")
+
+    def __init__(self, iterator, inputs, timer):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.iterator = iterator
+        self.inputs = inputs
+        self.timer = timer
+        self.items = 0
+        self.time = 0.0
+        self._next = iterator.__next__
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        start = _time.perf_counter()
+        try:
+            item = self._next()
+        finally:
+            self.time += _time.perf_counter() - start
+        self.items += 1
+        return item
+
+    def __next_chunk__(self, size):
+        """Return a list of up to size items, empty once exhausted."""
+        start = _time.perf_counter()
+        try:
+            chunk = _next_chunk(self.iterator, size)
+        finally:
+            self.time += _time.perf_counter() - start
+        self.items += len(chunk)
+        return chunk
+
+    def __length_hint__(self):
+        """Private method returning an estimate of len(list(it))."""
+        hint = _length_hint(self.iterator)
+        return NotImplemented if hint is None else hint
+
+    def stats(self):
+        """Return the counters of this stage and of its inputs, as a tree of dicts."""
+        node = {"stage": type(self.iterator).__name__,
+                "items_out": self.items,
+                "time": self.time}
+        timer = self.timer
+        if timer is not None:
+            function = timer.function
+            node["function"] = getattr(function, "__qualname__", None) or repr(function)
+            node["calls"] = timer.calls
+            node["function_time"] = timer.time
+        if self.inputs:
+            inputs = [probe.stats() for probe in self.inputs]
+            node["items_in"] = sum([child["items_out"] for child in inputs])
+            node["upstream_time"] = sum([child["time"] for child in inputs])
+            node["self_time"] = self.time - node["upstream_time"] - node.get("function_time", 0.0)
+            if isinstance(self.iterator, filter):
+                node["selectivity"] = self.items / node["items_in"] if node["items_in"] else None
+            node["inputs"] = inputs
+        return node
+
+    def dump(self, format="table"):
+        """Return stats() as a JSON document (format="json") or a text table."""
+        if format == "json":
+            import json
+            return json.dumps(self.stats(), indent=2)
+        if format != "table":
+            raise ValueError("format must be 'json' or 'table', not %r" % (format,))
+
+        rows = [("stage", "in", "out", "selectivity", "time", "self", "function", "upstream")]
+        nodes = [(0, self.stats())]
+        while nodes: # depth first, inputs below their stage
+            depth, node = nodes.pop()
+            name = node["stage"]
+            if "function" in node:
+                name += " " + node["function"]
+            seconds = lambda key: "%.6f" % node[key] if key in node else ""
+            selectivity = node.get("selectivity")
+            rows.append(("  " * depth + name,
+                         str(node["items_in"]) if "items_in" in node else "",
+                         str(node["items_out"]),
+                         "" if selectivity is None else "%.3f" % selectivity,
+                         seconds("time"), seconds("self_time"),
+                         seconds("function_time"), seconds("upstream_time")))
+            for child in node.get("inputs", ())[::-1]:
+                nodes.append((depth + 1, child))
+
+        widths = [0] * len(rows[0])
+        for row in rows:
+            widths = [width if width > len(cell) else len(cell) for width, cell in zip(widths, row)]
+        lines = []
+        for row in rows:
+            cells = [row[0].ljust(widths[0])]
+            cells.extend([cell.rjust(width) for cell, width in zip(row[1:], widths[1:])])
+            lines.append("  ".join(cells).rstrip())
+        return "\n".join(lines)
+
+class mmapfile:
+    """mmapfile(file, *, closefd=True, opener=None, advice=None) --> mmapfile object
+
+    Return a read-only binary file object over file (a path or a file
+    descriptor), mapped into memory, as given by open(file, "rb", mmap=True).
+    read() and readline() return memoryview slices of the mapping, and so
+    does iterating over the lines: nothing is copied until the caller needs
+    to (bytes(view)), and readinto() copies straight into the buffer given.
+    The views stay valid after close(), which only unmaps the file once the
+    last of them is released.  advice, or the madvise() method, tells the
+    operating system how the file will be read ("normal", "sequential",
+    "random" or "willneed"), where supported; with "sequential" for the
+    whole file, the pages already read are also given back every 64 MiB,
+    so that memory use stays bounded (they are read again if needed).
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"name": "Path or file descriptor given.",
+                 "mode": "Always 'rb'.",
+                 "_fd": "File descriptor, or None once closed.",
+                 "_closefd": "Whether close() closes the file descriptor.",
+                 "_map": "mmap of the file, or None for an empty file.",
+                 "_view": "memoryview of the whole file.",
+                 "_position": "Current offset.",
+                 "_dropped": "Offset up to which pages were given back, with sequential advice, or None."}
+
+    def __init__(self, file, *, closefd=True, opener=None, advice=None):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        import mmap
+
+        self.name = file
+        self.mode = "rb"
+        self._fd = None
+        if isinstance(file, int):
+            fd = file
+            self._closefd = closefd
+        else:
+            if not closefd:
+                raise ValueError("Cannot use closefd=False with file name")
+            flags = _os.O_RDONLY | getattr(_os, "O_BINARY", 0)
+            fd = _os.open(file, flags) if opener is None else opener(file, flags)
+            self._closefd = True
+
+        try:
+            size = _os.fstat(fd).st_size
+            self._map = mmap.mmap(fd, size, access=mmap.ACCESS_READ) if size else None
+        except BaseException:
+            if self._closefd:
+                _os.close(fd)
+            raise
+        self._fd = fd
+        self._view = memoryview(b"" if self._map is None else self._map)
+        self._position = 0
+        self._dropped = None
+        if advice is not None:
+            try:
+                self.madvise(advice)
+            except BaseException:
+                self.close()
+                raise
+
+    def madvise(self, advice, start=0, length=None):
+        """Tell the system how the file will be read, from start for length bytes."""
+        import mmap
+
+        names = {"normal": "MADV_NORMAL", "sequential": "MADV_SEQUENTIAL",
+                 "random": "MADV_RANDOM", "willneed": "MADV_WILLNEED"}
+        if advice not in names:
+            raise ValueError("advice must be 'normal', 'sequential', 'random' or 'willneed', not %r" % (advice,))
+        self._check_closed()
+        value = getattr(mmap, names[advice], None)
+        if value is None or self._map is None or not hasattr(self._map, "madvise"):
+            return # not supported here; only a hint anyway
+        if length is None:
+            length = len(self._view) - start
+        self._map.madvise(value, start, length)
+        if start or length != len(self._view):
+            return
+        # with sequential advice for the whole file, pages behind the reads are given back
+        self._dropped = 0 if advice == "sequential" and hasattr(mmap, "MADV_DONTNEED") else None
+
+    def _advance(self, end):
+        """Move the offset to end, giving back the pages before it every 64 MiB when reading sequentially."""
+        self._position = end
+        dropped = self._dropped
+        if dropped is not None and end - dropped >= 1 << 26:
+            import mmap
+            # the pages come back from the file if a view still uses them
+            offset = end // mmap.PAGESIZE * mmap.PAGESIZE
+            self._map.madvise(mmap.MADV_DONTNEED, dropped, offset - dropped)
+            self._dropped = offset
+
+    def _check_closed(self):
+        """Raise ValueError if the file is closed."""
+        if self._fd is None:
+            raise ValueError("I/O operation on closed file.")
+
+    @property
+    def closed(self):
+        """True if the file is closed."""
+        return self._fd is None
+
+    def fileno(self):
+        """Return the underlying file descriptor."""
+        self._check_closed()
+        return self._fd
+
+    def readable(self):
+        """Return whether the file was opened for reading."""
+        self._check_closed()
+        return True
+
+    def writable(self):
+        """Return whether the file was opened for writing."""
+        self._check_closed()
+        return False
+
+    def seekable(self):
+        """Return whether the file supports random access."""
+        self._check_closed()
+        return True
+
+    def isatty(self):
+        """Return whether the file is connected to a terminal."""
+        self._check_closed()
+        return False
+
+    def tell(self):
+        """Return the current offset."""
+        self._check_closed()
+        return self._position
+
+    def seek(self, offset, whence=0):
+        """Change the offset, relative to the start (0), the current offset (1) or the end (2)."""
+        self._check_closed()
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += len(self._view)
+        elif whence != 0:
+            raise ValueError("invalid whence (%r, should be 0, 1 or 2)" % (whence,))
+        if offset < 0:
+            raise ValueError("negative seek position %r" % (offset,))
+        self._position = offset
+        return offset
+
+    def read(self, size=-1):
+        """Return a memoryview of up to size bytes (all of them if negative) from the current offset."""
+        self._check_closed()
+        start = self._position
+        end = len(self._view)
+        if size is not None and size >= 0 and start + size < end:
+            end = start + size
+        if start >= end:
+            return self._view[0:0]
+        self._advance(end)
+        return self._view[start:end]
+
+    def readinto(self, buffer):
+        """Copy bytes from the current offset into buffer, and return how many."""
+        with memoryview(buffer) as target, target.cast("B") as target:
+            data = self.read(len(target))
+            target[:len(data)] = data
+            return len(data)
+
+    def readline(self, size=-1):
+        """Return a memoryview of the next line, with its newline, of at most size bytes."""
+        self._check_closed()
+        start = self._position
+        end = len(self._view)
+        if size is not None and size >= 0 and start + size < end:
+            end = start + size
+        if start >= end:
+            return self._view[0:0]
+        newline = self._map.find(b"\n", start, end)
+        if newline >= 0:
+            end = newline + 1
+        self._advance(end)
+        return self._view[start:end]
+
+    def readlines(self, hint=-1):
+        """Return a list of memoryviews of the next lines, up to about hint bytes."""
+        lines = []
+        total = 0
+        for line in self:
+            lines.append(line)
+            total += len(line)
+            if 0 < hint <= total:
+                break
+        return lines
+
+    def __iter__(self):
+        """Implement iter(self)."""
+        self._check_closed()
+        return self
+
+    def __next__(self):
+        """Implement next(self)."""
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def close(self):
+        """Close the file; the mapping goes once no view of it is left."""
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError: # views are still in use, and keep the mapping alive
+                pass
+        if self._closefd:
+            _os.close(fd)
+
+    def __enter__(self):
+        self._check_closed()
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, "_fd", None) is not None: # as FileIO, close when dropped
+            self.close()
+
+    def __repr__(self):
+        """Return repr(self)."""
+        return "<mmapfile name=%r mode='rb'%s>" % (self.name, " closed" if self._fd is None else "")
+
+# asynchronous counterparts, for asyncio pipelines
+
+class amap:
+    """amap(func, *aiterables, concurrency=None, ordered=True) --> amap object
+
+    Asynchronous map: make an asynchronous iterator that computes the function
+    using arguments from each of the iterables, which may be asynchronous or
+    plain iterables.  If the function returns an awaitable (e.g. it is a
+    coroutine function), the result is awaited.
+
+    By default, one result is awaited at a time.  With concurrency=N, up to N
+    results are awaited at once as tasks; they are returned in input order,
+    or in completion order when ordered is false.  If a result fails, or the
+    consumer is cancelled, the tasks still running are cancelled.  Call
+    aclose() to cancel them when not consuming everything.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"function": "Function applied to the items.",
+                 "iterators": "Asynchronous iterators over the wrapped iterables.",
+                 "_concurrency": "Maximum number of results awaited at once, or None.",
+                 "_ordered": "Whether results are returned in input order.",
+                 "_pending": "Deque of the tasks awaiting results, with a concurrency.",
+                 "_asyncio": "asyncio module, imported once, with a concurrency.",
+                 "_exhausted": "Whether an input iterator has run out."}
+
+    def __init__(self, func, *aiterables, concurrency=None, ordered=True):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("concurrency must be greater than 0")
+        self.function = func
+        self.iterators = tuple([_aiter(aiterable) for aiterable in aiterables])
+        self._concurrency = concurrency
+        self._ordered = ordered
+        self._pending = self._asyncio = None
+        self._exhausted = False
+        if concurrency is not None: # imported here, and not on every step
+            import asyncio
+            import collections
+            self._pending = collections.deque()
+            self._asyncio = asyncio
+
+    def __aiter__(self):
+        """Return an awaitable, that resolves in asynchronous iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return a value or raise StopAsyncIteration."""
+        if self._concurrency is None:
+            args = await _anext_row(self.iterators)
+            return await _await_result(self.function(*args))
+
+        asyncio = self._asyncio
+        pending = self._pending
+        try:
+            while not self._exhausted and len(pending) < self._concurrency:
+                try:
+                    args = await _anext_row(self.iterators)
+                except StopAsyncIteration:
+                    self._exhausted = True
+                    break
+                pending.append(asyncio.ensure_future(_await_result(self.function(*args))))
+
+            if not pending:
+                raise StopAsyncIteration
+
+            if self._ordered:
+                return await pending.popleft()
+
+            done = (await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))[0]
+            for task in pending:
+                if task in done:
+                    pending.remove(task)
+                    return task.result()
+
+        except BaseException:
+            self._cancel()
+            raise
+
+    def _cancel(self):
+        """Cancel the tasks still awaiting results."""
+        pending = self._pending
+        if pending:
+            for task in pending:
+                task.cancel()
+            pending.clear()
+
+    async def aclose(self):
+        """Cancel the pending results and close the inputs."""
+        self._cancel()
+        self._exhausted = True
+        await _aclose(*self.iterators)
+
+class afilter:
+    """afilter(function or None, aiterable) --> afilter object
+
+    Asynchronous filter: return an asynchronous iterator yielding those items
+    of the (asynchronous or plain) iterable for which function(item) is true;
+    an awaitable result is awaited first.  If function is None, return the
+    items that are true.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"callable": "Predicate, or None to test the items themselves.",
+                 "iterator": "Asynchronous iterator over the wrapped iterable."}
+
+    def __init__(self, callable, aiterable):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.callable = callable
+        self.iterator = _aiter(aiterable)
+
+    def __aiter__(self):
+        """Return an awaitable, that resolves in asynchronous iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return a value or raise StopAsyncIteration."""
+        caller = bool if self.callable is None else self.callable
+        anext = type(self.iterator).__anext__
+        while True:
+            value = await anext(self.iterator)
+            if await _await_result(caller(value)):
+                return value
+
+    async def aclose(self):
+        """Close the input."""
+        await _aclose(self.iterator)
+
+class azip:
+    """azip(aiter1 [,aiter2 [...]]) --> azip object
+
+    Asynchronous zip: return an asynchronous iterator of tuples, where the
+    i-th element comes from the i-th (asynchronous or plain) iterable.  It
+    stops when the shortest iterable is exhausted.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"iterators": "Asynchronous iterators over the wrapped iterables."}
+
+    def __init__(self, *aiterables):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.iterators = tuple([_aiter(aiterable) for aiterable in aiterables])
+
+    def __aiter__(self):
+        """Return an awaitable, that resolves in asynchronous iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return a value or raise StopAsyncIteration."""
+        if not self.iterators:
+            raise StopAsyncIteration
+        return await _anext_row(self.iterators)
+
+    async def aclose(self):
+        """Close the inputs."""
+        await _aclose(*self.iterators)
+
+class aenumerate:
+    """aenumerate(aiterable[, start]) -> asynchronous iterator for index, value
+
+    Asynchronous enumerate: yield pairs containing a count (from start, which
+    defaults to zero) and a value yielded by the (asynchronous or plain)
+    iterable argument.
+
+    Changes over built-in type:
+    + Not present in the built-in module
+    """
+
+    __slots__ = {"iterator": "Asynchronous iterator over the wrapped iterable.",
+                 "index": "Count returned with the next item."}
+
+    def __init__(self, aiterable, start=0):
+        """Initialize self. See help(type(self)) for accurate signature."""
+        self.iterator = _aiter(aiterable)
+        self.index = start
+
+    def __aiter__(self):
+        """Return an awaitable, that resolves in asynchronous iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return a value or raise StopAsyncIteration."""
+        item = await type(self.iterator).__anext__(self.iterator)
+        index = self.index
+        self.index = index + 1
+        return index, item
+
+    async def aclose(self):
+        """Close the input."""
+        await _aclose(self.iterator)
+
+async def aall(aiterable):
+    """aall(aiterable) -> bool
+
+    Return True if bool(x) is True for all values x in the asynchronous or
+    plain iterable.  If the iterable is empty, return True.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    iterator = _aiter(aiterable)
+    async for item in iterator:
+        if not item:
+            await _aclose(iterator)
+            return False
+    return True
+
+async def aany(aiterable):
+    """aany(aiterable) -> bool
+
+    Return True if bool(x) is True for any x in the asynchronous or plain
+    iterable.  If the iterable is empty, return False.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    iterator = _aiter(aiterable)
+    async for item in iterator:
+        if item:
+            await _aclose(iterator)
+            return True
+    return False
+
+async def amax(aiterable, *, key=None, default=_missing):
+    """amax(aiterable[, key=func][, default=obj]) -> value
+
+    Return the largest item of the asynchronous or plain iterable.  The key
+    function may return an awaitable.  If the iterable is empty, return
+    default, or raise ValueError if it is not given.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    highest = highest_key = _missing
+    async for item in _aiter(aiterable):
+        item_key = item if key is None else await _await_result(key(item))
+        if highest is _missing or highest_key < item_key:
+            highest, highest_key = item, item_key
+
+    if highest is _missing:
+        if default is _missing:
+            raise ValueError("amax() arg is an empty sequence")
+        return default
+    return highest
+
+async def amin(aiterable, *, key=None, default=_missing):
+    """amin(aiterable[, key=func][, default=obj]) -> value
+
+    Return the smallest item of the asynchronous or plain iterable.  The key
+    function may return an awaitable.  If the iterable is empty, return
+    default, or raise ValueError if it is not given.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    lowest = lowest_key = _missing
+    async for item in _aiter(aiterable):
+        item_key = item if key is None else await _await_result(key(item))
+        if lowest is _missing or item_key < lowest_key:
+            lowest, lowest_key = item, item_key
+
+    if lowest is _missing:
+        if default is _missing:
+            raise ValueError("amin() arg is an empty sequence")
+        return default
+    return lowest
+
+async def asorted(aiterable, *, key=None, reverse=False):
+    """asorted(aiterable, key=None, reverse=False) --> new sorted list
+
+    Sort the items of an asynchronous or plain iterable.  The key function
+    may return an awaitable.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    if key is None:
+        return sorted([item async for item in _aiter(aiterable)], reverse=reverse)
+
+    pairs = [(await _await_result(key(item)), item) async for item in _aiter(aiterable)]
+    pairs.sort(key=lambda pair: pair[0], reverse=reverse)
+    return [pair[1] for pair in pairs]
+
+async def asum(aiterable, start=0):
+    """asum(aiterable[, start]) -> value
+
+    Return the sum of an asynchronous or plain iterable of numbers (NOT
+    strings) plus the value of parameter 'start' (which defaults to 0).
+    When the iterable is empty, return start.
+
+    Changes over built-in function:
+    + Not present in the built-in module
+    """
+
+    if isinstance(start, str):
+        raise TypeError("asum() can't sum strings [use ''.join(seq) instead]")
+
+    async for item in _aiter(aiterable):
+        start += item
+    return start
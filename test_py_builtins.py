@@ -0,0 +1,230 @@
+"""Regression tests for py_builtins; run with python -m unittest or pytest."""
+
+import unittest
+
+import py_builtins as pb
+
+class ChunkTest(unittest.TestCase):
+
+    def test_zip_chunk_stops_at_short_filter_input(self):
+        xs = iter(range(100))
+        chunk = pb._next_chunk(pb.zip(xs, pb.filter(lambda v: v < 3, range(50))), 10)
+        self.assertEqual(chunk, [(0, 0), (1, 1), (2, 2)])
+        self.assertEqual(next(xs), 4) # as the built-in zip leaves it
+
+    def test_map_chunk_stops_at_short_filter_input(self):
+        xs = iter(range(100))
+        chunk = pb._next_chunk(pb.map(max, xs, pb.filter(lambda v: v < 3, range(50))), 10)
+        self.assertEqual(chunk, [0, 1, 2])
+        self.assertEqual(next(xs), 4)
+
+    def test_chunk_over_exact_inputs(self):
+        rows = pb._next_chunk(pb.zip(pb.range(5), pb.enumerate("abcdef")), 100)
+        self.assertEqual(rows, list(zip(range(5), enumerate("abcdef"))))
+
+class LengthHintTest(unittest.TestCase):
+
+    def test_filter_gives_no_length_hint(self):
+        # list() would preallocate for every item of the input
+        import operator
+        self.assertEqual(operator.length_hint(pb.filter(None, range(10 ** 7))), 0)
+
+    def test_list_of_filter_does_not_preallocate(self):
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            self.assertEqual(list(pb.filter(lambda v: v == 5, range(10 ** 5))), [5])
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 100000)
+
+    def test_map_over_filter_gives_no_length_hint(self):
+        import operator
+        self.assertEqual(operator.length_hint(pb.map(abs, pb.filter(None, range(100)))), 0)
+
+class MethodTest(unittest.TestCase):
+
+    def test_doc_and_module_come_from_the_function(self):
+        class A:
+            def f(cls):
+                "doc of f"
+            f = pb.classmethod(f)
+        self.assertEqual(A.f.__doc__, "doc of f")
+        self.assertEqual(A.f.__module__, __name__)
+        self.assertTrue(pb.method.__doc__.startswith("method(function, instance)"))
+        self.assertIs(type(pb.method.__module__), str)
+
+    def test_pickle_round_trip(self):
+        import pickle
+        self.assertIs(pickle.loads(pickle.dumps(pb.method)), pb.method)
+        bound = pickle.loads(pickle.dumps(pb.method(len, 1)))
+        self.assertIs(bound.__func__, len)
+        self.assertEqual(bound.__self__, 1)
+
+class SuperTest(unittest.TestCase):
+
+    def test_cooperative_chain(self):
+        super = pb.super
+        class A:
+            def f(self):
+                return "A"
+        class B(A):
+            def f(self):
+                return "B" + super().f()
+        class C(A):
+            def f(self):
+                return "C" + super().f()
+        class D(B, C):
+            def f(self):
+                return "D" + super().f()
+        self.assertEqual(D().f(), "DBCA")
+
+    def test_classmethod_and_property(self):
+        super = pb.super
+        class A:
+            @classmethod
+            def make(cls):
+                return cls
+            @property
+            def value(self):
+                return 1
+        class B(A):
+            @classmethod
+            def make(cls):
+                return super().make()
+            @property
+            def value(self):
+                return super().value + 1
+        self.assertIs(B.make(), B)
+        self.assertEqual(B().value, 2)
+
+    def test_errors_and_unbound(self):
+        self.assertRaises(TypeError, pb.super, int, "x")
+        self.assertRaises(TypeError, pb.super, 1, 2)
+        self.assertRaises(TypeError, pb.super, int, 1, 2)
+        self.assertEqual(repr(pb.super(int)), "<super: <class 'int'>, NULL>")
+
+    def test_dynamic_class_is_collected(self):
+        import gc
+        import weakref
+        namespace = {"super": pb.super}
+        exec("class A:\n    def m(self): return 1\n"
+             "class D(A):\n    def m(self): return super().m() + 1\n", namespace)
+        self.assertEqual(namespace["D"]().m(), 2)
+        ref = weakref.ref(namespace.pop("D"))
+        gc.collect()
+        self.assertIsNone(ref())
+
+class MapWorkersTest(unittest.TestCase):
+
+    def test_workers_none_is_a_plain_map(self):
+        result = pb.map(abs, [-1, -2], workers=None)
+        self.assertIs(type(result), pb.map)
+        self.assertEqual(list(result), [1, 2])
+
+    def test_options_need_workers(self):
+        self.assertRaises(TypeError, pb.map, abs, [-1], ordered=False)
+
+    def test_workers(self):
+        with pb.map(abs, range(-5, 0), workers=2) as result:
+            self.assertEqual(list(result), [5, 4, 3, 2, 1])
+
+    def test_subclass(self):
+        class squares(pb.map):
+            pass
+        self.assertEqual(list(squares(abs, [-3], workers=None)), [3])
+        self.assertEqual(list(squares(abs, [-3])), [3])
+        with self.assertRaises(TypeError) as context:
+            squares(abs, [-3], workers=2)
+        self.assertIn("squares() does not support workers", str(context.exception))
+
+class AmapTest(unittest.TestCase):
+
+    def test_concurrency(self):
+        import asyncio
+
+        async def double(value):
+            return value * 2
+
+        async def collect(**options):
+            return [value async for value in pb.amap(double, range(6), **options)]
+
+        self.assertEqual(asyncio.run(collect()), [0, 2, 4, 6, 8, 10])
+        self.assertEqual(asyncio.run(collect(concurrency=2)), [0, 2, 4, 6, 8, 10])
+        self.assertEqual(sorted(asyncio.run(collect(concurrency=3, ordered=False))), [0, 2, 4, 6, 8, 10])
+
+class DistinctTest(unittest.TestCase):
+
+    def test_nans_are_one_key(self):
+        nans = [float("nan"), float("nan")]
+        self.assertEqual(len(list(pb.distinct(nans + [1.0, 1.0]))), 2)
+
+    def test_keys_need_a_digest(self):
+        self.assertRaises(TypeError, list, pb.distinct([object()]))
+
+    def test_bytes_per_key(self):
+        distinct = pb.distinct(range(100000))
+        self.assertEqual(len(list(distinct)), 100000)
+        self.assertLessEqual(distinct.nbytes, 24 * 100000)
+
+class ReversedFileTest(unittest.TestCase):
+
+    def setUp(self):
+        import os
+        import tempfile
+        handle, self.path = tempfile.mkstemp()
+        os.write(handle, b"one\r\ntwo\rthree\nfour")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def lines(self, skip=0, **options):
+        with pb.open(self.path, **options) as file:
+            for _ in range(skip):
+                file.readline()
+            return list(pb.reversed(file))
+
+    def test_newline_modes(self):
+        for newline in (None, "", "\n", "\r", "\r\n"):
+            with pb.open(self.path, newline=newline) as file:
+                expected = file.readlines()[::-1]
+            self.assertEqual(self.lines(newline=newline), expected)
+        self.assertEqual(self.lines(newline=""), ["four", "three\n", "two\r", "one\r\n"])
+        self.assertEqual(self.lines(mode="rb"), [b"four", b"two\rthree\n", b"one\r\n"])
+
+    def test_from_the_current_position(self):
+        self.assertEqual(self.lines(1), ["four", "three\n", "two\n"])
+        self.assertEqual(self.lines(1, mode="rb"), [b"four", b"two\rthree\n"])
+        self.assertEqual(self.lines(4), [])
+
+class _Resuming:
+    """Iterator over values that raises StopIteration at each None, then goes on."""
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.values or self.values.pop(0) is None:
+            raise StopIteration
+        return 1
+
+class ZipPickleTest(unittest.TestCase):
+
+    def test_longest_keeps_exhausted_inputs(self):
+        import pickle
+        iterator = pb.zip(_Resuming([1, None, 1, 1]), [2, 3, 4], longest=True, fillvalue=0)
+        self.assertEqual([next(iterator), next(iterator)], [(1, 2), (0, 3)])
+        self.assertEqual(list(pickle.loads(pickle.dumps(iterator))), [(0, 4)])
+        self.assertEqual(list(iterator), [(0, 4)])
+
+    def test_exhausted_stays_exhausted(self):
+        import pickle
+        iterator = pb.zip(_Resuming([1, None, 1]), longest=True)
+        self.assertEqual(list(iterator), [(1,)])
+        self.assertEqual(list(pickle.loads(pickle.dumps(iterator))), [])
+
+if __name__ == "__main__":
+    unittest.main()